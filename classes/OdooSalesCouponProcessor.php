@@ -418,6 +418,12 @@ class OdooSalesCouponProcessor
         curl_setopt($ch, CURLOPT_TIMEOUT, 2);
         curl_setopt($ch, CURLOPT_CONNECTTIMEOUT, 1);
 
+        // Reach a debug server listening on a Unix domain socket (--unix-socket)
+        $unixSocket = Configuration::get('ODOO_SALES_SYNC_UNIX_SOCKET');
+        if ($unixSocket && defined('CURLOPT_UNIX_SOCKET_PATH')) {
+            curl_setopt($ch, CURLOPT_UNIX_SOCKET_PATH, $unixSocket);
+        }
+
         @curl_exec($ch);
         curl_close($ch);
     }
@@ -23,6 +23,7 @@ class OdooSalesWebhookClient
     private $webhookUrl;
     private $webhookSecret;
     private $timeout;
+    private $unixSocket;
     private $logger;
 
     /**
@@ -44,6 +45,8 @@ class OdooSalesWebhookClient
         $this->webhookUrl = Configuration::get('ODOO_SALES_SYNC_WEBHOOK_URL');
         $this->webhookSecret = Configuration::get('ODOO_SALES_SYNC_WEBHOOK_SECRET');
         $this->timeout = (int)Configuration::get('ODOO_SALES_SYNC_TIMEOUT', 30);
+        // Optional: reach a co-located receiver over a Unix domain socket
+        $this->unixSocket = Configuration::get('ODOO_SALES_SYNC_UNIX_SOCKET');
     }
 
     /**
@@ -298,6 +301,7 @@ class OdooSalesWebhookClient
         curl_setopt($ch, CURLOPT_RETURNTRANSFER, true);
         curl_setopt($ch, CURLOPT_TIMEOUT, $this->timeout);
         curl_setopt($ch, CURLOPT_CONNECTTIMEOUT, 5);
+        $this->applyUnixSocket($ch);
         curl_setopt($ch, CURLOPT_SSL_VERIFYPEER, false); // TODO: Set to true in production
         curl_setopt($ch, CURLOPT_SSL_VERIFYHOST, 0);     // TODO: Set to 2 in production
 
@@ -461,6 +465,20 @@ class OdooSalesWebhookClient
         return $delays[$index];
     }
 
+    /**
+     * Route a cURL handle through ODOO_SALES_SYNC_UNIX_SOCKET when configured
+     *
+     * The URL still selects the path and Host header; host and port are ignored.
+     *
+     * @param resource $ch cURL handle
+     */
+    private function applyUnixSocket($ch)
+    {
+        if ($this->unixSocket && defined('CURLOPT_UNIX_SOCKET_PATH')) {
+            curl_setopt($ch, CURLOPT_UNIX_SOCKET_PATH, $this->unixSocket);
+        }
+    }
+
     /**
      * Test webhook connection
      *
@@ -502,6 +520,7 @@ class OdooSalesWebhookClient
             curl_setopt($ch, CURLOPT_RETURNTRANSFER, true);
             curl_setopt($ch, CURLOPT_TIMEOUT, 10);
             curl_setopt($ch, CURLOPT_CONNECTTIMEOUT, 5);
+            $this->applyUnixSocket($ch);
             curl_setopt($ch, CURLOPT_SSL_VERIFYPEER, false);
             curl_setopt($ch, CURLOPT_SSL_VERIFYHOST, 0);
 
@@ -23,6 +23,8 @@ from datetime import datetime
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
+from webhook_schema import SchemaValidator
+
 # ANSI color codes for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -40,6 +42,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
 
     webhook_secret = None
     request_count = 0
+    validator = SchemaValidator()
 
     def do_GET(self):
         """Handle GET requests (health check)"""
@@ -117,6 +120,9 @@ class WebhookHandler(BaseHTTPRequestHandler):
         # Display webhook
         self.display_webhook(payload)
 
+        # Report schema problems (the payload is still accepted)
+        validation_errors = self.validate_payload(payload)
+
         # Send success response
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
@@ -126,8 +132,26 @@ class WebhookHandler(BaseHTTPRequestHandler):
             'message': 'Webhook received',
             'event_id': payload.get('event_id')
         }
+        if validation_errors:
+            response['validation_errors'] = validation_errors
         self.wfile.write(json.dumps(response).encode())
 
+    def validate_payload(self, payload):
+        """Validate a batch or single-event payload and print any errors"""
+        if isinstance(payload, dict) and 'batch_id' in payload and 'events' in payload:
+            errors = self.validator.validate_envelope(payload)
+            if not errors:
+                for event_errors in self.validator.validate_events(payload['events']).values():
+                    errors.extend(event_errors)
+        else:
+            errors = self.validator.validate_single(payload)
+
+        if errors:
+            print(f"{Colors.FAIL}❌ SCHEMA VALIDATION FAILED ({len(errors)} errors){Colors.ENDC}")
+            for error in errors:
+                print(f"   {Colors.FAIL}{error['path'] or 'payload'}: {error['message']}{Colors.ENDC}")
+        return errors
+
     def display_webhook(self, payload):
         """Display webhook payload in formatted output"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
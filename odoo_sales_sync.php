@@ -184,6 +184,7 @@ class odoo_sales_sync extends Module
         Configuration::deleteByName('ODOO_SALES_SYNC_WEBHOOK_URL');
         Configuration::deleteByName('ODOO_SALES_SYNC_WEBHOOK_SECRET');
         Configuration::deleteByName('ODOO_SALES_SYNC_DEBUG');
+        Configuration::deleteByName('ODOO_SALES_SYNC_UNIX_SOCKET');
 
         // v2.0.0 - Remove reverse sync configuration
         Configuration::deleteByName('ODOO_SALES_SYNC_REVERSE_ENABLED');
@@ -293,10 +294,12 @@ class odoo_sales_sync extends Module
             // v2.0.0 - Reverse sync configuration
             $reverseEnabled = Tools::getValue('ODOO_SALES_SYNC_REVERSE_ENABLED');
             $debugWebhookUrl = Tools::getValue('ODOO_SALES_SYNC_DEBUG_WEBHOOK_URL');
+            $unixSocket = trim(Tools::getValue('ODOO_SALES_SYNC_UNIX_SOCKET'));
             $allowedIps = Tools::getValue('ODOO_SALES_SYNC_REVERSE_ALLOWED_IPS');
 
             Configuration::updateValue('ODOO_SALES_SYNC_REVERSE_ENABLED', $reverseEnabled);
             Configuration::updateValue('ODOO_SALES_SYNC_DEBUG_WEBHOOK_URL', $debugWebhookUrl);
+            Configuration::updateValue('ODOO_SALES_SYNC_UNIX_SOCKET', $unixSocket);
             Configuration::updateValue('ODOO_SALES_SYNC_REVERSE_ALLOWED_IPS', $allowedIps);
 
             $output .= $this->displayConfirmation($this->l('Settings updated'));
@@ -438,6 +441,13 @@ class odoo_sales_sync extends Module
                         'size' => 64,
                         'desc' => $this->l('Optional: URL for webhook debug server (e.g., http://localhost:8000/webhook)')
                     ),
+                    array(
+                        'type' => 'text',
+                        'label' => $this->l('Debug Server Unix Socket'),
+                        'name' => 'ODOO_SALES_SYNC_UNIX_SOCKET',
+                        'size' => 64,
+                        'desc' => $this->l('Optional: socket path of a debug server started with --unix-socket on this host (e.g., /tmp/odoo_webhook.sock). Webhook and debug webhook requests are sent through it; the URLs then only select the path.')
+                    ),
                     array(
                         'type' => 'text',
                         'label' => $this->l('Allowed IPs (Optional)'),
@@ -469,6 +479,7 @@ class odoo_sales_sync extends Module
         $helper->fields_value['ODOO_SALES_SYNC_REVERSE_ENABLED'] = Configuration::get('ODOO_SALES_SYNC_REVERSE_ENABLED');
         $helper->fields_value['ODOO_SALES_SYNC_REVERSE_WEBHOOK_URL_DISPLAY'] = $reverseWebhookUrl;
         $helper->fields_value['ODOO_SALES_SYNC_DEBUG_WEBHOOK_URL'] = Configuration::get('ODOO_SALES_SYNC_DEBUG_WEBHOOK_URL');
+        $helper->fields_value['ODOO_SALES_SYNC_UNIX_SOCKET'] = Configuration::get('ODOO_SALES_SYNC_UNIX_SOCKET');
         $helper->fields_value['ODOO_SALES_SYNC_REVERSE_ALLOWED_IPS'] = Configuration::get('ODOO_SALES_SYNC_REVERSE_ALLOWED_IPS');
 
         $formHtml = $helper->generateForm(array($fieldsForm));
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Reverse Sync Load Driver
+
+Generates reverse sync payloads (Odoo -> PrestaShop) that are valid for
+OdooSalesReverseWebhookRouter::validatePayload and sends them to
+reverse_webhook.php at a target rate over pooled keep-alive connections,
+then reports latency by entity type and action.
+
+A local stand-in for reverse_webhook.php is bundled (--standin) so the
+driver itself can be exercised offline.
+
+Usage:
+    python3 reverse_sync_load_driver.py --url URL --secret SECRET [--rate N] [--duration S]
+    python3 reverse_sync_load_driver.py --standin --rate 200 --duration 10
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import json
+import argparse
+import http.client
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+# Mirrors OdooSalesReverseWebhookRouter::validatePayload
+VALID_ENTITY_TYPES = ['customer', 'contact', 'order', 'address', 'coupon', 'discount', 'cart_rule']
+VALID_ACTIONS = ['created', 'updated', 'deleted']
+
+DEFAULT_URL = 'http://localhost/modules/odoo_sales_sync/reverse_webhook.php'
+
+# ANSI color codes
+class Colors:
+    HEADER = '\033[95m'
+    OKBLUE = '\033[94m'
+    OKCYAN = '\033[96m'
+    OKGREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+
+def validate_payload(payload):
+    """Python port of validatePayload: returns None if valid, else the error"""
+    if not isinstance(payload, dict):
+        return 'Payload must be a JSON object'
+    # PHP isset() treats null as missing
+    if payload.get('entity_type') is None:
+        return 'Missing required field: entity_type'
+    if payload.get('data') is None:
+        return 'Missing required field: data'
+    if payload['entity_type'] not in VALID_ENTITY_TYPES:
+        return 'Invalid entity_type. Must be one of: ' + ', '.join(VALID_ENTITY_TYPES)
+    if payload.get('action_type') is not None and payload['action_type'] not in VALID_ACTIONS:
+        return 'Invalid action_type. Must be one of: ' + ', '.join(VALID_ACTIONS)
+    return None
+
+
+class PayloadGenerator:
+    """Build reverse sync payloads with the fields each processor reads"""
+
+    def __init__(self, seed=None, id_range=10000):
+        self.rng = random.Random(seed)
+        self.id_range = id_range
+        self._event_counter = 0
+        self._lock = threading.Lock()
+
+    def next_event_id(self):
+        with self._lock:
+            self._event_counter += 1
+            return f'load_{int(time.time())}_{self._event_counter}'
+
+    def build(self, entity_type, action_type):
+        builders = {
+            'customer': self._build_customer,
+            'contact': self._build_customer,
+            'order': self._build_order,
+            'address': self._build_address,
+            'coupon': self._build_coupon,
+            'discount': self._build_coupon,
+            'cart_rule': self._build_coupon
+        }
+        data = builders[entity_type]()
+        if action_type != 'created':
+            data['id'] = self.rng.randint(1, self.id_range)
+        return {
+            'event_id': self.next_event_id(),
+            'entity_type': entity_type,
+            'action_type': action_type,
+            'data': data
+        }
+
+    def _build_customer(self):
+        n = self.rng.randint(1, 10 ** 7)
+        return {
+            'email': f'load.test.{n}@example.com',
+            'firstname': 'Load',
+            'lastname': f'Test{n}',
+            'company': 'Load Test SL',
+            'active': True,
+            'newsletter': self.rng.random() < 0.5,
+            'optin': False,
+            'id_gender': self.rng.choice([1, 2])
+        }
+
+    def _build_order(self):
+        return {
+            'reference': ''.join(self.rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ') for _ in range(9)),
+            'current_state': self.rng.choice([2, 3, 4, 5]),
+            'tracking_number': f'1Z{self.rng.randint(10 ** 9, 10 ** 10 - 1)}',
+            'note': 'Updated from load driver'
+        }
+
+    def _build_address(self):
+        return {
+            'id_customer': self.rng.randint(1, self.id_range),
+            'alias': 'Load test',
+            'firstname': 'Load',
+            'lastname': 'Test',
+            'address1': 'Calle Mayor 1',
+            'city': 'Madrid',
+            'postcode': f'{self.rng.randint(1000, 52999):05d}',
+            'id_country': 6,
+            'phone': '600000000'
+        }
+
+    def _build_coupon(self):
+        return {
+            'code': f'LOAD{self.rng.randint(10 ** 5, 10 ** 6 - 1)}',
+            'name': 'Load test coupon',
+            'reduction_percent': self.rng.choice([5, 10, 15]),
+            'reduction_amount': 0,
+            'quantity': 100,
+            'quantity_per_user': 1,
+            'active': True,
+            'free_shipping': False,
+            'date_from': '2025-01-01 00:00:00',
+            'date_to': '2030-12-31 23:59:59'
+        }
+
+
+class LatencyStats:
+    """Latency samples and outcomes per (entity_type, action_type)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.status_codes = {}
+        self.sent = 0
+        self.lateness = []
+
+    def record(self, key, latency, status=None, error=None, lateness=0.0):
+        with self._lock:
+            self.sent += 1
+            self.samples.setdefault(key, []).append(latency)
+            self.lateness.append(lateness)
+            code = status if status is not None else 'error'
+            self.status_codes[code] = self.status_codes.get(code, 0) + 1
+            if error or status is None or status >= 400:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    @staticmethod
+    def percentile(sorted_values, pct):
+        if not sorted_values:
+            return 0.0
+        idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+        return sorted_values[idx]
+
+    def get_report(self, elapsed):
+        report = {
+            'sent': self.sent,
+            'elapsed_seconds': round(elapsed, 3),
+            'achieved_rate': round(self.sent / elapsed, 2) if elapsed else 0.0,
+            'status_codes': {str(code): count for code, count in self.status_codes.items()},
+            'max_send_lateness_ms': round(max(self.lateness, default=0.0) * 1000, 2),
+            'by_entity_action': {}
+        }
+        for (entity_type, action_type), values in sorted(self.samples.items()):
+            values = sorted(values)
+            report['by_entity_action'][f'{entity_type}/{action_type}'] = {
+                'count': len(values),
+                'errors': self.errors.get((entity_type, action_type), 0),
+                'mean_ms': round(sum(values) / len(values) * 1000, 2),
+                'p50_ms': round(self.percentile(values, 50) * 1000, 2),
+                'p90_ms': round(self.percentile(values, 90) * 1000, 2),
+                'p99_ms': round(self.percentile(values, 99) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2)
+            }
+        return report
+
+
+class LoadDriver:
+    """Open-loop driver: requests are scheduled at the target rate and sent
+    by a pool of workers, each holding one keep-alive connection"""
+
+    def __init__(self, url, secret, rate, connections, entity_types, actions, seed=None, timeout=30):
+        parsed = urlparse(url)
+        self.scheme = parsed.scheme or 'http'
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port
+        self.path = parsed.path or '/'
+        if parsed.query:
+            self.path += '?' + parsed.query
+        self.secret = secret
+        self.rate = rate
+        self.connections = connections
+        self.entity_types = entity_types
+        self.actions = actions
+        self.timeout = timeout
+        self.generator = PayloadGenerator(seed)
+        self.stats = LatencyStats()
+        self._queue = queue.Queue()
+
+    def _connect(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _worker(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            scheduled_at, payload = item
+            key = (payload['entity_type'], payload['action_type'])
+            body = json.dumps(payload).encode('utf-8')
+            headers = {
+                'Content-Type': 'application/json',
+                'X-Webhook-Secret': self.secret or '',
+                'Connection': 'keep-alive'
+            }
+            started = time.perf_counter()
+            try:
+                conn.request('POST', self.path, body, headers)
+                response = conn.getresponse()
+                response.read()
+                # Latency is measured from the scheduled send time to avoid coordinated omission
+                self.stats.record(key, time.perf_counter() - scheduled_at, status=response.status,
+                                  lateness=started - scheduled_at)
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    conn = self._connect()
+            except (OSError, http.client.HTTPException) as e:
+                self.stats.record(key, time.perf_counter() - scheduled_at, error=str(e),
+                                  lateness=started - scheduled_at)
+                conn.close()
+                conn = self._connect()
+        conn.close()
+
+    def run(self, duration=None, total_requests=None):
+        """Send requests at the target rate until duration or count is reached"""
+        workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.connections)]
+        for worker in workers:
+            worker.start()
+
+        rng = self.generator.rng
+        interval = 1.0 / self.rate
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            scheduled_at = start + sent * interval
+            if duration is not None and scheduled_at - start >= duration:
+                break
+            if total_requests is not None and sent >= total_requests:
+                break
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            payload = self.generator.build(rng.choice(self.entity_types), rng.choice(self.actions))
+            self._queue.put((scheduled_at, payload))
+            sent += 1
+
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+        return self.stats.get_report(time.perf_counter() - start)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in reproducing the reverse_webhook.php HTTP contract"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+    webhook_secret = None
+    latency_seconds = 0.0
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(405, {'success': False, 'error': 'Method not allowed. Use POST.'})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        content_length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(content_length)
+
+        if self.webhook_secret and self.headers.get('X-Webhook-Secret', '') != self.webhook_secret:
+            self._send(403, {'success': False, 'error': 'Invalid webhook secret'})
+            return
+        if not raw:
+            self._send(400, {'success': False, 'error': 'Empty payload'})
+            return
+        try:
+            payload = json.loads(raw.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            self._send(400, {'success': False, 'error': f'Invalid JSON: {e}'})
+            return
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        error = validate_payload(payload)
+        if error:
+            # reverse_webhook.php answers router failures with HTTP 500
+            result = {'success': False, 'error': error}
+        else:
+            data = payload['data']
+            result = {
+                'success': True,
+                'entity_id': data.get('id', random.randint(1, 10 ** 6)),
+                'message': f"{payload['entity_type'].capitalize()} {payload.get('action_type', 'updated')} successfully"
+            }
+        result['received_at'] = datetime.now().astimezone().isoformat()
+        result['processing_time_seconds'] = round(time.perf_counter() - started, 3)
+        self._send(200 if result['success'] else 500, result)
+
+    def log_message(self, format, *args):
+        """Suppress per-request logging"""
+        pass
+
+
+def start_standin(secret=None, latency_ms=0.0, port=0):
+    """Start the stand-in endpoint in a background thread, return (server, url)"""
+    StandInHandler.webhook_secret = secret
+    StandInHandler.latency_seconds = latency_ms / 1000.0
+    server = ThreadingHTTPServer(('127.0.0.1', port), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/modules/odoo_sales_sync/reverse_webhook.php'
+
+
+def print_report(report):
+    """Print the latency report as a table"""
+    print(f"\n{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.HEADER}   Reverse Sync Load Report{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}\n")
+    print(f"Sent: {Colors.BOLD}{report['sent']}{Colors.ENDC} in {report['elapsed_seconds']}s " +
+          f"({report['achieved_rate']} req/s)")
+    print(f"Status codes: {report['status_codes']}")
+    print(f"Max send lateness: {report['max_send_lateness_ms']} ms\n")
+
+    print(f"{Colors.BOLD}{'entity/action':<22}{'count':>8}{'errors':>8}{'mean':>10}{'p50':>10}" +
+          f"{'p90':>10}{'p99':>10}{'max':>10}{Colors.ENDC}")
+    for key, row in report['by_entity_action'].items():
+        color = Colors.FAIL if row['errors'] else ''
+        print(f"{color}{key:<22}{row['count']:>8}{row['errors']:>8}{row['mean_ms']:>10}{row['p50_ms']:>10}" +
+              f"{row['p90_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}{Colors.ENDC if color else ''}")
+    print("\n(latencies in ms, measured from scheduled send time)\n")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Load driver for the Odoo Sales Sync reverse webhook (reverse_webhook.php)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --standin --rate 200 --duration 10
+  %(prog)s --url https://shop.example.com/modules/odoo_sales_sync/reverse_webhook.php --secret s3cret
+  %(prog)s --url http://localhost:8080/modules/odoo_sales_sync/reverse_webhook.php \\
+           --secret s3cret --rate 20 --requests 1000 --entities customer,order --actions updated
+        """
+    )
+
+    parser.add_argument('--url', type=str, default=DEFAULT_URL,
+                        help=f'reverse_webhook.php URL (default: {DEFAULT_URL})')
+    parser.add_argument('--secret', type=str, default=None,
+                        help='Value of the X-Webhook-Secret header (ODOO_SALES_SYNC_WEBHOOK_SECRET)')
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help='Target requests per second (default: 10)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Run for this many seconds (default: 10 unless --requests is given)')
+    parser.add_argument('--requests', type=int, default=None,
+                        help='Stop after this many requests')
+    parser.add_argument('--connections', type=int, default=8,
+                        help='Number of pooled keep-alive connections (default: 8)')
+    parser.add_argument('--entities', type=str, default=','.join(VALID_ENTITY_TYPES),
+                        help='Comma-separated entity types to generate (default: all)')
+    parser.add_argument('--actions', type=str, default=','.join(VALID_ACTIONS),
+                        help='Comma-separated actions to generate (default: all)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for reproducible payload sequences')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='Per-request timeout in seconds (default: 30)')
+    parser.add_argument('--json-report', type=str, default=None,
+                        help='Write the report as JSON to this file')
+    parser.add_argument('--standin', action='store_true',
+                        help='Start the bundled local stand-in endpoint and target it (offline test)')
+    parser.add_argument('--standin-latency-ms', type=float, default=0.0,
+                        help='Artificial processing latency of the stand-in (default: 0)')
+
+    args = parser.parse_args()
+
+    entity_types = [e.strip() for e in args.entities.split(',') if e.strip()]
+    actions = [a.strip() for a in args.actions.split(',') if a.strip()]
+    for entity_type in entity_types:
+        if entity_type not in VALID_ENTITY_TYPES:
+            parser.error(f'Invalid entity type: {entity_type}')
+    for action in actions:
+        if action not in VALID_ACTIONS:
+            parser.error(f'Invalid action: {action}')
+    if args.rate <= 0 or args.connections <= 0:
+        parser.error('--rate and --connections must be positive')
+
+    url = args.url
+    standin = None
+    if args.standin:
+        standin, url = start_standin(args.secret, args.standin_latency_ms)
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Stand-in endpoint: {Colors.BOLD}{url}{Colors.ENDC}")
+
+    duration = args.duration
+    if duration is None and args.requests is None:
+        duration = 10.0
+
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  Target: {Colors.BOLD}{url}{Colors.ENDC}")
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  Rate: {args.rate} req/s, connections: {args.connections}, " +
+          f"entities: {', '.join(entity_types)}, actions: {', '.join(actions)}")
+
+    driver = LoadDriver(url, args.secret, args.rate, args.connections, entity_types, actions,
+                        seed=args.seed, timeout=args.timeout)
+    try:
+        report = driver.run(duration=duration, total_requests=args.requests)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.WARNING}Interrupted{Colors.ENDC}")
+        return
+
+    print_report(report)
+
+    if args.json_report:
+        with open(args.json_report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Report written to {args.json_report}")
+
+    if standin:
+        standin.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Incremental Sales Aggregates for the Debug Webhook Server
+
+Keeps running totals from order events so the receiver can be reconciled
+against PrestaShop during load tests:
+
+    - revenue (total_paid_tax_incl) by currency
+    - order count by current_state
+    - quantities by product (product_id:product_attribute_id)
+
+Nothing is recomputed from history: every event is applied as the
+difference between its `before_data` and `after_data` snapshots (a create
+only adds, a delete only subtracts, a status change moves one order from
+one state to another). Amounts are kept in integer cents so the totals
+never drift. The published summary is cached and only rebuilt after a
+change, so reads are O(1).
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import threading
+
+
+def _to_cents(value):
+    try:
+        return round(float(value) * 100)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def order_contribution(data):
+    """Return what one order snapshot adds to the aggregates, or None"""
+    if not isinstance(data, dict) or not data:
+        return None
+
+    quantities = {}
+    for line in data.get('order_details') or []:
+        if not isinstance(line, dict) or line.get('product_id') is None:
+            continue
+        key = f"{line['product_id']}:{line.get('product_attribute_id') or 0}"
+        quantities[key] = quantities.get(key, 0) + _to_int(line.get('product_quantity'))
+
+    return {
+        'currency': str(data.get('id_currency', 'unknown')),
+        'revenue_cents': _to_cents(data.get('total_paid_tax_incl')),
+        'state': str(data.get('current_state', 'unknown')),
+        'quantities': quantities
+    }
+
+
+class SalesAggregates:
+    """Revenue, order and product totals maintained from before/after diffs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.revenue_cents = {}
+        self.orders_by_state = {}
+        self.product_quantities = {}
+        self.order_count = 0
+        self.events_applied = 0
+        self.events_ignored = 0
+        self.missing_before = 0
+        # Last snapshot applied per order, used when an update has no before_data
+        self._last_by_order = {}
+        self._summary = None
+
+    def apply_events(self, events):
+        """Apply a list of accepted events under a single lock acquisition"""
+        with self._lock:
+            for event in events:
+                self._apply(event)
+            self._summary = None
+
+    def _apply(self, event):
+        order_id = event.get('entity_id')
+        if event.get('entity_type') != 'order' or not isinstance(order_id, (int, str)):
+            self.events_ignored += 1
+            return
+
+        action_type = event.get('action_type')
+        before = order_contribution(event.get('before_data'))
+        after = order_contribution(event.get('after_data'))
+
+        if before is None:
+            # Fall back to the state this receiver last saw for the order; this
+            # also keeps a redelivered (or doubly emitted) create from counting twice
+            before = self._last_by_order.get(order_id)
+            if before is None and after is not None and action_type != 'created':
+                self.missing_before += 1
+
+        if before is not None:
+            self._add(before, -1)
+        if after is not None:
+            self._add(after, 1)
+            self._last_by_order[order_id] = after
+        else:
+            self._last_by_order.pop(order_id, None)
+        self.events_applied += 1
+
+    def _add(self, contribution, sign):
+        currency = contribution['currency']
+        self.revenue_cents[currency] = self.revenue_cents.get(currency, 0) + sign * contribution['revenue_cents']
+        _bump(self.orders_by_state, contribution['state'], sign)
+        self.order_count += sign
+        for key, quantity in contribution['quantities'].items():
+            _bump(self.product_quantities, key, sign * quantity)
+
+    def get_summary(self):
+        with self._lock:
+            if self._summary is None:
+                self._summary = {
+                    'orders': self.order_count,
+                    'revenue_by_currency': {
+                        currency: cents / 100 for currency, cents in self.revenue_cents.items()
+                    },
+                    'orders_by_state': dict(self.orders_by_state),
+                    'product_quantities': dict(self.product_quantities),
+                    'events_applied': self.events_applied,
+                    'events_ignored': self.events_ignored,
+                    'missing_before': self.missing_before
+                }
+            return self._summary
+
+
+def _bump(counts, key, delta):
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        # Drop zero entries so deleted orders and products disappear
+        counts.pop(key, None)
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Offline Analytics over Captured Webhook Archives
+
+Answers the usual post-load-test questions from the indented JSON log
+written by webhook_debug_server.py --log-file:
+
+    - event rate per minute by entity type (by receipt time)
+    - batch size distribution
+    - sync lag: receipt time minus each event's hook_timestamp
+
+The archive is streamed once in fixed-size chunks. Entries and event fields
+are located by regular expressions anchored at their exact indentation, so
+nested order data is skipped without JSON decoding. The fields are packed
+into compact columns (stdlib `array`: 10 bytes per event, 12 per batch), and
+the reports are computed with vectorized NumPy operations when NumPy is
+installed, or with plain Python otherwise (same results, slower).
+
+Rotated (.1, .2, ...) and gzip-compressed archives can be passed together.
+Both timestamps are naive local times; if PrestaShop and the receiver run
+in different time zones, correct the lag with --hook-offset.
+
+Usage:
+    python3 webhook_archive_analytics.py webhooks.log [webhooks.log.1 ...]
+    python3 webhook_archive_analytics.py webhooks.log --json-report report.json
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import json
+import argparse
+import gzip
+import math
+import re
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# Patterns start with a literal (no ^ anchor) so `re` can use its fast
+# prefix search instead of trying every position of the buffer.
+# Entry header written by WebhookHandler.log_to_file (json.dumps(..., indent=2));
+# only the top-level object has keys indented by exactly 2 spaces
+ENTRY_PATTERN = re.compile(
+    rb'\{\n  "timestamp": "([^"]*)",\n  "level": "[^"]*",\n  "message": "([^"]*)"')
+# Batch events are at depth 4 (entry > data > events > event): 8 spaces
+BATCH_ENTITY_PATTERN = re.compile(rb'\n        "entity_type": "([^"]*)"')
+BATCH_HOOK_TS_PATTERN = re.compile(rb'\n        "hook_timestamp": "([^"]*)"')
+BATCH_EVENT_PATTERN = re.compile(rb'\n        "(entity_type|hook_timestamp)": "([^"]*)"')
+# Single-event payloads are the entry's data: 4 spaces
+SINGLE_ENTITY_PATTERN = re.compile(rb'\n    "entity_type": "([^"]*)"')
+SINGLE_HOOK_TS_PATTERN = re.compile(rb'\n    "hook_timestamp": "([^"]*)"')
+
+BATCH_MESSAGE = b'Batch webhook received'
+SINGLE_MESSAGE = b'Webhook received'
+
+# Upper bounds of the batch size buckets; 0 counts payloads with an empty `events` list
+BATCH_SIZE_BUCKETS = [0, 1, 5, 10, 25, 50, 100, 250, 500, 1000]
+PERCENTILES = [50, 90, 99]
+
+_EPOCH = datetime(1970, 1, 1)
+
+# ANSI color codes
+class Colors:
+    HEADER = '\033[95m'
+    OKBLUE = '\033[94m'
+    OKCYAN = '\033[96m'
+    OKGREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+
+def parse_timestamp(value):
+    """Naive 'YYYY-MM-DD HH:MM:SS[.ffffff]' (or ISO 'T') to seconds, NaN if invalid"""
+    try:
+        return (datetime.fromisoformat(value.decode('ascii')) - _EPOCH).total_seconds()
+    except (ValueError, UnicodeDecodeError):
+        # e.g. PrestaShop's '0000-00-00 00:00:00' or an empty hook_timestamp
+        return math.nan
+
+
+class _Codes(dict):
+    """Entity type -> small integer code, assigned on first sight"""
+
+    def __missing__(self, key):
+        code = self[key] = len(self)
+        return code
+
+
+class _TimestampCache(dict):
+    """hook_timestamp has second resolution: most values repeat within a batch"""
+
+    def __missing__(self, key):
+        if len(self) > 100000:
+            self.clear()
+        value = self[key] = parse_timestamp(key)
+        return value
+
+
+class WebhookArchive:
+    """Columnar view of the events found in one or more webhook log archives"""
+
+    def __init__(self):
+        self.entity_codes = _Codes()
+        # Per event
+        self.event_entity = array('H')
+        self.event_hook_ts = array('d')
+        # Per logged payload (a batch, or a single event as a batch of 1)
+        self.entry_received = array('d')
+        self.entry_size = array('I')
+        self.entries_skipped = 0
+        self.bytes_read = 0
+        self._hook_ts = _TimestampCache()
+
+    def load(self, path, chunk_size=CHUNK_SIZE):
+        """Stream one archive file into the columns"""
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            pending = b''
+            while True:
+                chunk = f.read(chunk_size)
+                self.bytes_read += len(chunk)
+                if not chunk:
+                    break
+                buffer = pending + chunk
+                # Only parse complete entries; keep the rest for the next chunk
+                end = buffer.rfind(b'\n}\n')
+                if end < 0:
+                    pending = buffer
+                    continue
+                self._parse(buffer, end + 3)
+                pending = buffer[end + 3:]
+            if pending.strip():
+                self._parse(pending, len(pending))
+
+    def _parse(self, buffer, end):
+        headers = list(ENTRY_PATTERN.finditer(buffer, 0, end))
+        for idx, header in enumerate(headers):
+            body_end = headers[idx + 1].start() if idx + 1 < len(headers) else end
+            message = header.group(2)
+            if message == BATCH_MESSAGE:
+                entities = BATCH_ENTITY_PATTERN.findall(buffer, header.end(), body_end)
+                hook_ts = BATCH_HOOK_TS_PATTERN.findall(buffer, header.end(), body_end)
+                if len(hook_ts) != len(entities):
+                    entities, hook_ts = self._align(buffer, header.end(), body_end)
+            elif message == SINGLE_MESSAGE:
+                entities = SINGLE_ENTITY_PATTERN.findall(buffer, header.end(), body_end)[:1]
+                hook_ts = SINGLE_HOOK_TS_PATTERN.findall(buffer, header.end(), body_end)[:1] or [b'']
+                if not entities:
+                    self.entries_skipped += 1
+                    continue
+            else:
+                # Errors, rejected payloads
+                self.entries_skipped += 1
+                continue
+
+            self.entry_received.append(parse_timestamp(header.group(1)))
+            self.entry_size.append(len(entities))
+            # map() keeps the per-event work in C; only unseen values reach Python
+            self.event_entity.extend(map(self.entity_codes.__getitem__, entities))
+            self.event_hook_ts.extend(map(self._hook_ts.__getitem__, hook_ts))
+
+    def _align(self, buffer, start, end):
+        """Pair entity_type and hook_timestamp per event when some events lack one"""
+        entities = []
+        hook_ts = []
+        for field, value in BATCH_EVENT_PATTERN.findall(buffer, start, end):
+            if field == b'entity_type':
+                entities.append(value)
+                hook_ts.append(b'')
+            elif entities and not hook_ts[-1]:
+                hook_ts[-1] = value
+        return entities, hook_ts
+
+    @property
+    def entity_names(self):
+        names = [''] * len(self.entity_codes)
+        for name, code in self.entity_codes.items():
+            names[code] = name.decode('utf-8', 'replace')
+        return names
+
+
+def _nearest_rank(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not len(sorted_values):
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return float(sorted_values[rank - 1])
+
+
+def _distribution(sorted_values, total):
+    """Summary of a sorted numeric column"""
+    if not len(sorted_values):
+        return {'count': 0}
+    summary = {
+        'count': len(sorted_values),
+        'mean': round(total / len(sorted_values), 3),
+        'min': float(sorted_values[0]),
+        'max': float(sorted_values[-1])
+    }
+    for percent in PERCENTILES:
+        summary[f'p{percent}'] = _nearest_rank(sorted_values, percent)
+    return summary
+
+
+def _counted_distribution(counts, total, scale=1):
+    """Same summary as _distribution() for a column kept as {integer value: occurrences}"""
+    count = sum(counts.values())
+    if not count:
+        return {'count': 0}
+    values = sorted(counts)
+    summary = {
+        'count': count,
+        'mean': round(total / count, 3),
+        'min': values[0] / scale,
+        'max': values[-1] / scale
+    }
+    ranks = [(percent, max(1, math.ceil(percent / 100 * count))) for percent in PERCENTILES]
+    seen = 0
+    for value in values:
+        seen += counts[value]
+        while ranks and ranks[0][1] <= seen:
+            summary[f'p{ranks.pop(0)[0]}'] = value / scale
+    return summary
+
+
+def _bucket_label(lower, upper):
+    if upper is None:
+        return f'>{lower - 1}'
+    return str(upper) if lower == upper else f'{lower}-{upper}'
+
+
+def _batch_buckets(counts_by_upper):
+    """Turn [(upper bound, count)] into labelled histogram buckets"""
+    buckets = {}
+    lower = 0
+    for upper, count in counts_by_upper:
+        buckets[_bucket_label(lower, upper)] = count
+        lower = (upper if upper is not None else lower) + 1
+    return buckets
+
+
+def analyze_numpy(archive, hook_offset=0.0):
+    """Compute the reports with vectorized NumPy operations"""
+    names = archive.entity_names
+    sizes = numpy.frombuffer(archive.entry_size, dtype=numpy.uint32).astype(numpy.int64)
+    received = numpy.frombuffer(archive.entry_received, dtype=numpy.float64)
+    entity = numpy.frombuffer(archive.event_entity, dtype=numpy.uint16).astype(numpy.int64)
+    hook_ts = numpy.frombuffer(archive.event_hook_ts, dtype=numpy.float64)
+
+    # Event rate per minute by entity type (receipt minute of the carrying payload)
+    minute = numpy.repeat(numpy.floor(received / 60), sizes)
+    valid = ~numpy.isnan(minute)
+    minute = minute[valid].astype(numpy.int64)
+    rates = {}
+    if minute.size:
+        first = minute.min()
+        cells = numpy.bincount((minute - first) * len(names) + entity[valid],
+                               minlength=(minute.max() - first + 1) * len(names))
+        table = cells.reshape(-1, len(names))
+        for row in numpy.flatnonzero(table.sum(axis=1)):
+            rates[_minute_label((first + row) * 60)] = {
+                names[code]: int(table[row, code]) for code in numpy.flatnonzero(table[row])
+            }
+
+    # Batch size distribution
+    upper_bounds = numpy.array(BATCH_SIZE_BUCKETS)
+    bucket_index = numpy.searchsorted(upper_bounds, sizes, side='left')
+    bucket_counts = numpy.bincount(bucket_index, minlength=len(BATCH_SIZE_BUCKETS) + 1)
+    batch_sizes = _distribution(numpy.sort(sizes), int(sizes.sum()))
+    batch_sizes['buckets'] = _batch_buckets(zip(BATCH_SIZE_BUCKETS + [None], bucket_counts.tolist()))
+
+    # Sync lag per event
+    lag = numpy.repeat(received, sizes) - (hook_ts + hook_offset)
+    measured = ~numpy.isnan(lag)
+    lag_by_entity = {}
+    for code, name in enumerate(names):
+        values = numpy.sort(lag[measured & (entity == code)])
+        lag_by_entity[name] = _lag_summary(_distribution(values, float(values.sum())))
+    values = numpy.sort(lag[measured])
+    lag_summary = _lag_summary(_distribution(values, float(values.sum())))
+    lag_summary['missing_hook_timestamp'] = int((~measured).sum())
+    lag_summary['negative'] = int((values < 0).sum())
+    lag_summary['by_entity_type'] = lag_by_entity
+
+    return _report(archive, rates, batch_sizes, lag_summary, 'numpy')
+
+
+def analyze_python(archive, hook_offset=0.0):
+    """Compute the same reports with the standard library only
+
+    Lags and batch sizes are kept as histograms ({value: occurrences}, lags
+    in integer milliseconds, the precision of the report) instead of lists,
+    so memory grows with the number of distinct values, not with events.
+    """
+    names = archive.entity_names
+    rates = {}
+    lag_counts = [{} for _ in names]
+    lag_totals = [0.0] * len(names)
+    negative = 0
+    offset = 0
+    for received, size in zip(archive.entry_received, archive.entry_size):
+        codes = archive.event_entity[offset:offset + size]
+        hooks = archive.event_hook_ts[offset:offset + size]
+        offset += size
+        if math.isnan(received) or not size:
+            continue
+        row = rates.setdefault(_minute_label(math.floor(received / 60) * 60), {})
+        for code, hook in zip(codes, hooks):
+            name = names[code]
+            row[name] = row.get(name, 0) + 1
+            if not math.isnan(hook):
+                lag = received - (hook + hook_offset)
+                counts = lag_counts[code]
+                key = round(lag * 1000)
+                counts[key] = counts.get(key, 0) + 1
+                lag_totals[code] += lag
+                if lag < 0:
+                    negative += 1
+    rates = {minute: rates[minute] for minute in sorted(rates)}
+
+    size_counts = {}
+    for size in archive.entry_size:
+        size_counts[size] = size_counts.get(size, 0) + 1
+    bucket_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+    for size, count in size_counts.items():
+        upper_index = 0
+        while upper_index < len(BATCH_SIZE_BUCKETS) and size > BATCH_SIZE_BUCKETS[upper_index]:
+            upper_index += 1
+        bucket_counts[upper_index] += count
+    batch_sizes = _counted_distribution(size_counts, sum(archive.entry_size))
+    batch_sizes['buckets'] = _batch_buckets(zip(BATCH_SIZE_BUCKETS + [None], bucket_counts))
+
+    all_counts = {}
+    for counts in lag_counts:
+        for key, count in counts.items():
+            all_counts[key] = all_counts.get(key, 0) + count
+    lag_summary = _lag_summary(_counted_distribution(all_counts, sum(lag_totals), 1000))
+    lag_summary['missing_hook_timestamp'] = len(archive.event_hook_ts) - sum(all_counts.values())
+    lag_summary['negative'] = negative
+    lag_summary['by_entity_type'] = {
+        name: _lag_summary(_counted_distribution(lag_counts[code], lag_totals[code], 1000))
+        for code, name in enumerate(names)
+    }
+
+    return _report(archive, rates, batch_sizes, lag_summary, 'python')
+
+
+def _lag_summary(summary):
+    for key in ('mean', 'min', 'max') + tuple(f'p{percent}' for percent in PERCENTILES):
+        if summary.get(key) is not None:
+            summary[key] = round(summary[key], 3)
+    return summary
+
+
+def _minute_label(seconds):
+    return (_EPOCH + timedelta(seconds=int(seconds))).strftime('%Y-%m-%d %H:%M')
+
+
+def _report(archive, rates, batch_sizes, lag_summary, engine):
+    per_minute = [sum(row.values()) for row in rates.values()]
+    return {
+        'engine': engine,
+        'bytes_read': archive.bytes_read,
+        'payloads': len(archive.entry_size),
+        'events': len(archive.event_entity),
+        'entries_skipped': archive.entries_skipped,
+        'events_per_minute': {
+            'minutes': len(rates),
+            'peak': max(per_minute) if per_minute else 0,
+            'mean': round(sum(per_minute) / len(per_minute), 1) if per_minute else 0,
+            'by_minute': rates
+        },
+        'batch_sizes': batch_sizes,
+        'lag_seconds': lag_summary
+    }
+
+
+def print_report(report, max_rows=60):
+    """Print the reports as tables"""
+    print(f"\n{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.HEADER}   Webhook Archive Analytics{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}\n")
+    print(f"Payloads: {Colors.BOLD}{report['payloads']}{Colors.ENDC}, events: {Colors.BOLD}{report['events']}" +
+          f"{Colors.ENDC}, skipped entries: {report['entries_skipped']} ({report['engine']})")
+
+    rates = report['events_per_minute']
+    names = sorted({name for row in rates['by_minute'].values() for name in row})
+    print(f"\n{Colors.BOLD}Events per minute{Colors.ENDC} (peak {rates['peak']}, mean {rates['mean']})")
+    print(f"{Colors.BOLD}{'minute':<18}" + ''.join(f'{name[:10]:>11}' for name in names) + f"{'total':>11}{Colors.ENDC}")
+    rows = list(rates['by_minute'].items())
+    for minute, row in rows[:max_rows]:
+        print(f"{minute:<18}" + ''.join(f'{row.get(name, 0):>11}' for name in names) + f"{sum(row.values()):>11}")
+    if len(rows) > max_rows:
+        print(f"... {len(rows) - max_rows} more minutes (see --json-report)")
+
+    sizes = report['batch_sizes']
+    if sizes['count']:
+        print(f"\n{Colors.BOLD}Batch sizes{Colors.ENDC} (mean {sizes['mean']}, p50 {sizes['p50']:.0f}, " +
+              f"p90 {sizes['p90']:.0f}, p99 {sizes['p99']:.0f}, max {sizes['max']:.0f})")
+        widest = max(sizes['buckets'].values()) or 1
+        for label, count in sizes['buckets'].items():
+            print(f"{label:>10} {count:>10}  {'#' * round(40 * count / widest)}")
+
+    lag = report['lag_seconds']
+    print(f"\n{Colors.BOLD}Sync lag (receipt - hook_timestamp, seconds){Colors.ENDC}")
+    print(f"{Colors.BOLD}{'entity':<14}{'count':>10}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}{Colors.ENDC}")
+    for name, row in list(lag['by_entity_type'].items()) + [('all', lag)]:
+        if row['count']:
+            print(f"{name:<14}{row['count']:>10}{row['mean']:>10}{row['p50']:>10}{row['p90']:>10}{row['p99']:>10}{row['max']:>10}")
+    if lag['missing_hook_timestamp'] or lag['negative']:
+        print(f"{Colors.WARNING}⚠ {lag['missing_hook_timestamp']} events without hook_timestamp, " +
+              f"{lag['negative']} negative lags (clock or time zone skew: see --hook-offset){Colors.ENDC}")
+    print()
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Offline analytics over webhook_debug_server.py log archives',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s webhooks.log
+  %(prog)s webhooks.log.2 webhooks.log.1 webhooks.log --json-report report.json
+  %(prog)s archive/webhooks.log.gz --hook-offset 3600 --engine python
+        """
+    )
+
+    parser.add_argument('archives', nargs='+',
+                        help='Log files written with --log-file (rotated and .gz files accepted)')
+    parser.add_argument('--hook-offset', type=float, default=0.0,
+                        help='Seconds added to hook_timestamp before computing lag (time zone correction)')
+    parser.add_argument('--engine', choices=['auto', 'numpy', 'python'], default='auto',
+                        help='Vectorized NumPy or pure Python reports (default: numpy if installed)')
+    parser.add_argument('--max-rows', type=int, default=60,
+                        help='Minutes shown in the per-minute table (default: 60)')
+    parser.add_argument('--json-report', type=str, default=None,
+                        help='Write the full report as JSON to this file')
+
+    args = parser.parse_args()
+
+    engine = args.engine
+    if engine == 'auto':
+        engine = 'numpy' if numpy is not None else 'python'
+    elif engine == 'numpy' and numpy is None:
+        parser.error('NumPy is not installed (use --engine python)')
+
+    archive = WebhookArchive()
+    started = datetime.now()
+    for path in args.archives:
+        try:
+            archive.load(path)
+        except OSError as e:
+            print(f"{Colors.FAIL}✗ Cannot read {path}: {e}{Colors.ENDC}")
+            sys.exit(1)
+
+    report = analyze_numpy(archive, args.hook_offset) if engine == 'numpy' else analyze_python(archive, args.hook_offset)
+    report['elapsed_seconds'] = round((datetime.now() - started).total_seconds(), 3)
+
+    print_report(report, args.max_rows)
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  {report['bytes_read'] / 1e6:.1f} MB, {report['events']} events " +
+          f"in {report['elapsed_seconds']}s")
+
+    if args.json_report:
+        with open(args.json_report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Report written to {args.json_report}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Debug Webhook Server Microbenchmarks
+
+In-process benchmarks (no sockets) of the hot pieces of
+webhook_debug_server.py, measured in isolation:
+
+    - WebhookStats.record_success
+    - JSON decoding of order batches
+    - indent_json / display_event_summary rendering to a null sink
+    - log_to_file serialization (to a null stream)
+    - handle_info_page HTML generation
+
+Payload fixtures are pinned: they are built deterministically (no random,
+fixed dates) in increasing sizes, and a digest of every fixture is stored
+with the results so a baseline is only compared against the same inputs.
+
+Results are written as JSON (--json-report) and can be checked against a
+stored baseline: the run fails (exit status 1) when any benchmark is slower
+than the baseline by more than --max-regression percent.
+
+Usage:
+    python3 webhook_benchmarks.py [--filter TEXT] [--json-report FILE]
+    python3 webhook_benchmarks.py --baseline baseline.json --max-regression 15
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import json
+import argparse
+import contextlib
+import hashlib
+import logging
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+
+from webhook_debug_server import WebhookHandler, WebhookStats, build_shop
+from webhook_shops import DEFAULT_SHOP, ShopRegistry
+
+# Events per batch fixture
+FIXTURE_SIZES = (1, 10, 100, 1000)
+# Order lines per order event
+LINES_PER_ORDER = 5
+
+# ANSI color codes
+class Colors:
+    HEADER = '\033[95m'
+    OKBLUE = '\033[94m'
+    OKCYAN = '\033[96m'
+    OKGREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+
+class NullSink:
+    """Text and binary sink that discards everything (measures rendering only)"""
+
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def build_order_data(order_id, state):
+    """Deterministic order snapshot shaped like prepareEventData() output"""
+    lines = [
+        {
+            'id_order_detail': order_id * 10 + line,
+            'product_id': 100 + line,
+            'product_attribute_id': line,
+            'product_name': f'T-Shirt - Color {line} - Size M',
+            'product_reference': f'TS-{line:03d}-M',
+            'product_quantity': 1 + line % 3,
+            'unit_price_tax_incl': 30.25,
+            'unit_price_tax_excl': 25.0,
+            'total_price_tax_incl': round(30.25 * (1 + line % 3), 2),
+            'total_price_tax_excl': 25.0 * (1 + line % 3),
+            'tax_rate': 21.0
+        }
+        for line in range(LINES_PER_ORDER)
+    ]
+    return {
+        'id_order': order_id,
+        'reference': f'REF{order_id:06d}',
+        'date_add': '2025-11-15 14:30:00',
+        'date_upd': '2025-11-15 14:35:00',
+        'current_state': state,
+        'id_customer': 1000 + order_id % 97,
+        'id_currency': 1,
+        'total_paid_tax_incl': sum(line['total_price_tax_incl'] for line in lines),
+        'total_paid_tax_excl': sum(line['total_price_tax_excl'] for line in lines),
+        'payment': 'Credit Card',
+        'order_details': lines
+    }
+
+
+def build_order_batch(event_count):
+    """Deterministic batch of `event_count` order status changes"""
+    events = []
+    for idx in range(event_count):
+        order_id = 1000 + idx
+        events.append({
+            'event_id': 50000 + idx,
+            'entity_type': 'order',
+            'entity_id': order_id,
+            'entity_name': f'REF{order_id:06d}',
+            'action_type': 'status_changed',
+            'transaction_hash': f'order_{order_id}_status_changed_1763217300',
+            'correlation_id': f'00000000-0000-4000-8000-{order_id:012d}',
+            'hook_name': 'actionOrderStatusPostUpdate',
+            'hook_timestamp': '2025-11-15 14:35:00',
+            'before_data': build_order_data(order_id, 2),
+            'after_data': build_order_data(order_id, 4),
+            'change_summary': 'Order status changed: 2 -> 4',
+            'context_data': {'id_shop': 1, 'id_lang': 1}
+        })
+    return {'batch_id': f'batch_{event_count:05d}', 'timestamp': '2025-11-15T14:35:00', 'events': events}
+
+
+def make_handler():
+    """WebhookHandler wired to null sinks, without a socket or a server"""
+    handler = WebhookHandler.__new__(WebhookHandler)
+    handler.wfile = NullSink()
+    handler.request_version = 'HTTP/1.1'
+    handler.requestline = 'GET / HTTP/1.1'
+    handler.command = 'GET'
+    handler.client_address = ('127.0.0.1', 0)
+    handler.server = type('BenchServer', (), {'server_port': 5000})()
+
+    shop = build_shop(DEFAULT_SHOP)
+    file_logger = logging.getLogger('webhook_benchmark')
+    file_logger.setLevel(logging.INFO)
+    file_logger.propagate = False
+    stream_handler = logging.StreamHandler(NullSink())
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    file_logger.handlers = [stream_handler]
+    shop.file_logger = file_logger
+
+    shops = ShopRegistry()
+    shops.register(shop)
+    handler.shops = shops
+    handler.shop = shop
+    return handler
+
+
+def build_benchmarks(sizes):
+    """Return {name: callable} and {fixture: digest} for the given batch sizes"""
+    handler = make_handler()
+    stats = WebhookStats()
+    benchmarks = {
+        'stats.record_success': lambda: stats.record_success('order', 'status_changed', False),
+        'render.info_page': handler.handle_info_page
+    }
+    fixtures = {}
+
+    event = build_order_batch(1)['events'][0]
+    benchmarks['render.display_event_summary'] = lambda: handler.display_event_summary(event)
+
+    for size in sizes:
+        payload = build_order_batch(size)
+        body = json.dumps(payload).encode('utf-8')
+        fixtures[f'batch_{size}'] = hashlib.sha256(body).hexdigest()[:16]
+
+        benchmarks[f'json.decode/batch_{size}'] = lambda body=body: json.loads(body.decode('utf-8'))
+        benchmarks[f'render.indent_json/batch_{size}'] = lambda payload=payload: handler.indent_json(payload)
+        benchmarks[f'log_to_file/batch_{size}'] = (
+            lambda payload=payload: handler.log_to_file('INFO', 'Batch webhook received', payload))
+
+    return benchmarks, fixtures
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Time `func` with timeit: calibrate the loop count, then keep the best and median of `repeat` runs"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    # autorange stops at >= 0.2s; scale to the requested minimum time per run
+    number = max(1, int(number * min_time / 0.2))
+    runs = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'best_us': round(min(runs) * 1e6, 3),
+        'median_us': round(statistics.median(runs) * 1e6, 3),
+        'loops': number,
+        'repeat': repeat
+    }
+
+
+def run_benchmarks(name_filter=None, sizes=FIXTURE_SIZES, repeat=5, min_time=0.2):
+    """Run the suite and return the machine-readable results"""
+    benchmarks, fixtures = build_benchmarks(sizes)
+    results = {}
+    # Rendering benchmarks print; send it all to a null sink
+    with contextlib.redirect_stdout(NullSink()), contextlib.redirect_stderr(NullSink()):
+        for name, func in benchmarks.items():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = measure(func, repeat=repeat, min_time=min_time)
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'fixtures': fixtures,
+        'results': results
+    }
+
+
+def compare_to_baseline(report, baseline, max_regression):
+    """Return (rows, regressions) comparing best times against a stored baseline"""
+    rows = []
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append((name, result, None))
+            continue
+        change = (result['best_us'] - base['best_us']) / base['best_us'] * 100
+        rows.append((name, result, change))
+        if change > max_regression:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_report(rows, max_regression=None):
+    """Print the results as a table"""
+    print(f"\n{Colors.BOLD}{'benchmark':<36}{'best µs':>14}{'median µs':>14}{'loops':>10}{'vs base':>10}{Colors.ENDC}")
+    for name, result, change in rows:
+        color = ''
+        delta = ''
+        if change is not None:
+            delta = f'{change:+.1f}%'
+            if max_regression is not None and change > max_regression:
+                color = Colors.FAIL
+            elif change < 0:
+                color = Colors.OKGREEN
+        print(f"{name:<36}{result['best_us']:>14}{result['median_us']:>14}{result['loops']:>10}" +
+              f"{color}{delta:>10}{Colors.ENDC if color else ''}")
+    print()
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='In-process microbenchmarks for the debug webhook server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --filter json.decode
+  %(prog)s --json-report baseline.json
+  %(prog)s --baseline baseline.json --max-regression 15 --json-report current.json
+        """
+    )
+
+    parser.add_argument('--filter', type=str, default=None,
+                        help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--sizes', type=str, default=','.join(str(size) for size in FIXTURE_SIZES),
+                        help='Comma-separated batch fixture sizes (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timed runs per benchmark (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Minimum seconds per timed run (default: 0.2)')
+    parser.add_argument('--json-report', type=str, default=None,
+                        help='Write the results as JSON to this file (usable as a baseline)')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Baseline results JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help='Fail if a benchmark is slower than the baseline by more than this percent (default: 10)')
+
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        parser.error('--sizes must be comma-separated integers')
+    if not sizes or min(sizes) <= 0 or args.repeat <= 0 or args.min_time <= 0:
+        parser.error('--sizes, --repeat and --min-time must be positive')
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  Python {platform.python_version()} " +
+          f"({platform.python_implementation()}), fixtures: {', '.join(f'batch_{size}' for size in sizes)}")
+    report = run_benchmarks(args.filter, sizes, args.repeat, args.min_time)
+
+    regressions = []
+    if baseline:
+        changed_fixtures = [name for name, digest in report['fixtures'].items()
+                            if baseline.get('fixtures', {}).get(name, digest) != digest]
+        if changed_fixtures:
+            print(f"{Colors.FAIL}✗ Fixtures differ from the baseline: {', '.join(changed_fixtures)}" +
+                  f" - regenerate the baseline{Colors.ENDC}")
+            sys.exit(2)
+        rows, regressions = compare_to_baseline(report, baseline, args.max_regression)
+        report['baseline'] = args.baseline
+        report['max_regression_percent'] = args.max_regression
+        report['regressions'] = regressions
+    else:
+        rows = [(name, result, None) for name, result in report['results'].items()]
+
+    print_report(rows, args.max_regression if baseline else None)
+
+    if args.json_report:
+        with open(args.json_report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Results written to {args.json_report}")
+
+    if regressions:
+        print(f"{Colors.FAIL}✗ {len(regressions)} benchmark(s) regressed by more than " +
+              f"{args.max_regression}%: {', '.join(regressions)}{Colors.ENDC}")
+        sys.exit(1)
+    if baseline:
+        print(f"{Colors.OKGREEN}✓ No regression above {args.max_regression}%{Colors.ENDC}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Batch Coalescing Analyzer
+
+Detects redundant events inside the batches built by
+OdooSalesWebhookClient::sendBatchRequest (several updates to the same
+entity) and across a short sliding time window between batches.
+
+Used by webhook_debug_server.py to report how many events could have been
+collapsed, and optionally to apply only the final state of each entity
+while still answering with a correct per-index `results` array.
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# Identity values that can be used as a dict key (malformed events may carry objects or arrays)
+_KEY_TYPES = (str, int, float)
+
+
+def entity_key(event):
+    """Return the coalescing key of an event, or None if it has no usable identity"""
+    entity_type = event.get('entity_type')
+    entity_id = event.get('entity_id')
+    if not isinstance(entity_type, _KEY_TYPES) or not isinstance(entity_id, _KEY_TYPES):
+        return None
+    return (entity_type, entity_id)
+
+
+class CoalescePlan:
+    """Result of analyzing one batch"""
+
+    def __init__(self, events):
+        self.events = events
+        # Index of the event that carries the final state, per input index
+        self.final_index = list(range(len(events)))
+        # Indexes that must actually be applied, in batch order
+        self.applied = []
+        # Events superseded by a later event in the same batch
+        self.in_batch_collapsible = 0
+        # Events whose entity was already seen within the time window
+        self.window_collapsible = 0
+        self.by_entity_type = {}
+
+    def build_results(self):
+        """Build the per-index `results` array expected by the PHP client"""
+        results = []
+        for idx, final_idx in enumerate(self.final_index):
+            if final_idx == idx:
+                results.append({'success': True})
+            else:
+                results.append({
+                    'success': True,
+                    'coalesced': True,
+                    'superseded_by': final_idx
+                })
+        return results
+
+    def to_dict(self):
+        return {
+            'events': len(self.events),
+            'distinct_entities': len(self.applied),
+            'in_batch_collapsible': self.in_batch_collapsible,
+            'window_collapsible': self.window_collapsible,
+            'by_entity_type': self.by_entity_type
+        }
+
+
+class BatchCoalescer:
+    """Track redundant events per batch and across a sliding time window"""
+
+    def __init__(self, window_seconds=5.0, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.total_batches = 0
+        self.total_events = 0
+        self.in_batch_collapsible = 0
+        self.window_collapsible = 0
+        self.by_entity_type = {}
+        # key -> last time the entity was seen, plus insertion-ordered expiry queue
+        self._last_seen = {}
+        self._expiry = deque()
+        self._lock = threading.Lock()
+
+    def analyze(self, events):
+        """Analyze a batch and return a CoalescePlan"""
+        with self._lock:
+            return self._analyze(events)
+
+    def _analyze(self, events):
+        plan = CoalescePlan(events)
+        now = self.clock()
+        self._expire(now)
+
+        # Last index per key wins: walk backwards so each key is resolved once
+        last_index = {}
+        for idx in range(len(events) - 1, -1, -1):
+            key = entity_key(events[idx])
+            if key is None:
+                continue
+            if key in last_index:
+                plan.final_index[idx] = last_index[key]
+                plan.in_batch_collapsible += 1
+                plan.by_entity_type[key[0]] = plan.by_entity_type.get(key[0], 0) + 1
+            else:
+                last_index[key] = idx
+
+        for idx, final_idx in enumerate(plan.final_index):
+            if final_idx == idx:
+                plan.applied.append(idx)
+
+        # Cross-batch window: count final events whose entity was seen recently
+        for idx in plan.applied:
+            key = entity_key(events[idx])
+            if key is None:
+                continue
+            if key in self._last_seen:
+                plan.window_collapsible += 1
+            self._last_seen[key] = now
+            self._expiry.append((now, key))
+
+        self.total_batches += 1
+        self.total_events += len(events)
+        self.in_batch_collapsible += plan.in_batch_collapsible
+        self.window_collapsible += plan.window_collapsible
+        for entity_type, count in plan.by_entity_type.items():
+            self.by_entity_type[entity_type] = self.by_entity_type.get(entity_type, 0) + count
+
+        return plan
+
+    def _expire(self, now):
+        """Drop entities not seen within the window (amortized O(1))"""
+        cutoff = now - self.window_seconds
+        while self._expiry and self._expiry[0][0] < cutoff:
+            seen_at, key = self._expiry.popleft()
+            # Only forget the key if it was not refreshed later
+            if self._last_seen.get(key) == seen_at:
+                del self._last_seen[key]
+
+    def get_summary(self):
+        with self._lock:
+            collapsible = self.in_batch_collapsible + self.window_collapsible
+            ratio = collapsible / self.total_events if self.total_events else 0.0
+            return {
+                'window_seconds': self.window_seconds,
+                'total_batches': self.total_batches,
+                'total_events': self.total_events,
+                'in_batch_collapsible': self.in_batch_collapsible,
+                'window_collapsible': self.window_collapsible,
+                'collapsible_ratio': round(ratio, 4),
+                'by_entity_type': dict(self.by_entity_type)
+            }
@@ -23,13 +23,28 @@ Version: 1.0.0
 import json
 import argparse
 import logging
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 from logging.handlers import RotatingFileHandler
 import os
 import sys
 
+from webhook_aggregates import SalesAggregates
+from webhook_coalescing import BatchCoalescer
+from webhook_diff import DEFAULT_IGNORED_FIELDS, NoopDetector
+from webhook_ratelimit import RateLimit, admit
+from webhook_schema import AsyncValidator, SchemaValidator, build_failure_result
+from webhook_faults import BUILTIN_PROFILES, FAULT_ERROR, FAULT_RESET, FAULT_TIMEOUT, FaultInjector, load_fault_profile
+from webhook_profiler import ProfilerBusy, RequestProfiler
+from webhook_shops import DEFAULT_SHOP, ShopContext, ShopRegistry, load_shops_config
+
 # ANSI color codes
 class Colors:
     HEADER = '\033[95m'
@@ -52,38 +67,86 @@ class WebhookStats:
         self.by_action_type = {}
         self.reverse_sync_count = 0  # NEW: Track reverse sync events
         self.start_time = datetime.now()
+        # Requests are handled in threads
+        self._lock = threading.Lock()
 
     def record_success(self, entity_type, action_type, is_reverse_sync=False):
-        self.total_requests += 1
-        self.successful += 1
-        self.by_entity_type[entity_type] = self.by_entity_type.get(entity_type, 0) + 1
-        self.by_action_type[action_type] = self.by_action_type.get(action_type, 0) + 1
-        if is_reverse_sync:
-            self.reverse_sync_count += 1
+        # Without inline validation, malformed events may carry object or array types
+        entity_type = entity_type if type(entity_type) is str else 'unknown'
+        action_type = action_type if type(action_type) is str else 'unknown'
+        with self._lock:
+            self.total_requests += 1
+            self.successful += 1
+            self.by_entity_type[entity_type] = self.by_entity_type.get(entity_type, 0) + 1
+            self.by_action_type[action_type] = self.by_action_type.get(action_type, 0) + 1
+            if is_reverse_sync:
+                self.reverse_sync_count += 1
 
     def record_failure(self, reason):
-        self.total_requests += 1
-        self.failed += 1
+        with self._lock:
+            self.total_requests += 1
+            self.failed += 1
 
     def get_summary(self):
         uptime = datetime.now() - self.start_time
-        return {
-            'uptime_seconds': uptime.total_seconds(),
-            'total_requests': self.total_requests,
-            'successful': self.successful,
-            'failed': self.failed,
-            'reverse_sync': self.reverse_sync_count,  # NEW
-            'by_entity_type': self.by_entity_type,
-            'by_action_type': self.by_action_type
-        }
+        with self._lock:
+            return {
+                'uptime_seconds': uptime.total_seconds(),
+                'total_requests': self.total_requests,
+                'successful': self.successful,
+                'failed': self.failed,
+                'reverse_sync': self.reverse_sync_count,  # NEW
+                'by_entity_type': dict(self.by_entity_type),
+                'by_action_type': dict(self.by_action_type)
+            }
+
+class WebhookHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server so slow requests never block other connections"""
+    daemon_threads = True
+    # Default backlog (5) drops SYNs under concurrent load tests
+    request_queue_size = 128
+
+class WebhookUnixHTTPServer(WebhookHTTPServer):
+    """Threaded HTTP server on a Unix domain socket (curl CURLOPT_UNIX_SOCKET_PATH)"""
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind() resolves a host name; a socket path has none
+        socketserver.TCPServer.server_bind(self)
+        # PHP usually runs as another user (www-data); TCP on 0.0.0.0 is more open than this
+        os.chmod(self.server_address, 0o666)
+        self.server_name = 'localhost'
+        self.server_port = None
+
+    def get_request(self):
+        request, _ = self.socket.accept()
+        # Unix clients have no address; BaseHTTPRequestHandler expects (host, port)
+        return request, ('unix', 0)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
 
 class WebhookHandler(BaseHTTPRequestHandler):
     """HTTP request handler for webhook receiver"""
 
-    webhook_secret = None
-    stats = WebhookStats()
-    file_logger = None
-    log_file_path = None
+    shops = ShopRegistry()
+    shops.register(ShopContext(DEFAULT_SHOP, stats=WebhookStats(), coalescer=BatchCoalescer(),
+                               aggregates=SalesAggregates(), noop_detector=NoopDetector()))
+    coalesce_apply = False
+    faults = FaultInjector('healthy', {})
+    # Global token-bucket RateLimit across all shops, or None
+    rate_limit = None
+    # Schema validation: 'off', 'inline' (per-event results) or 'async' (after the ack);
+    # run_server() starts the AsyncValidator that 'async' needs
+    validator = SchemaValidator()
+    validate_mode = 'off'
+    async_validator = None
+    # RequestProfiler behind /debug/profile (only with --profile), or None
+    profiler = None
+    # Shop handling the current request (set per request in do_POST)
+    shop = None
 
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
@@ -99,12 +162,22 @@ class WebhookHandler(BaseHTTPRequestHandler):
             self.handle_health_check()
         elif parsed.path == '/stats':
             self.handle_stats()
+        elif parsed.path.startswith('/stats/'):
+            self.handle_shop_stats(parsed.path[len('/stats/'):])
+        elif parsed.path == '/aggregates':
+            self.handle_aggregates()
+        elif parsed.path.startswith('/aggregates/'):
+            self.handle_aggregates(parsed.path[len('/aggregates/'):])
+        elif parsed.path == '/debug/profile' and self.profiler:
+            self.handle_profile(parse_qs(parsed.query))
         else:
             self.handle_info_page()
 
     def do_POST(self):
         """Handle POST requests (webhook payloads)"""
-        if self.path == '/webhook':
+        shop = self.shops.resolve(self.path)
+        if shop is not None:
+            self.shop = shop
             self.handle_webhook()
         else:
             self.send_error(404, f"Endpoint not found: {self.path}")
@@ -119,7 +192,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
         response = {
             'status': 'ok',
             'message': 'Webhook receiver is running',
-            'stats': self.stats.get_summary()
+            'stats': self.shops.default.stats.get_summary()
         }
         self.wfile.write(json.dumps(response, indent=2).encode())
 
@@ -130,9 +203,81 @@ class WebhookHandler(BaseHTTPRequestHandler):
         self.send_header('Content-Type', 'application/json')
         self.end_headers()
 
-        stats = self.stats.get_summary()
+        stats = self._get_shop_summary(self.shops.default)
+        if len(self.shops) > 1:
+            stats['shops'] = {shop.name: self._get_shop_summary(shop) for shop in self.shops}
+        if self.faults.is_active:
+            stats['faults'] = self.faults.get_summary()
+        if self.rate_limit:
+            stats['rate_limit'] = self.rate_limit.get_summary()
+        if self.validate_mode != 'off':
+            stats['validation'] = self.validator.get_summary()
+            stats['validation']['mode'] = self.validate_mode
+            if self.async_validator:
+                stats['validation']['dropped'] = self.async_validator.dropped
+                stats['validation']['worker_errors'] = self.async_validator.errors
         self.wfile.write(json.dumps(stats, indent=2).encode())
 
+    def handle_shop_stats(self, shop_name):
+        """Per-shop statistics endpoint"""
+        shop = self.shops.get(shop_name)
+        if shop is None:
+            self.send_error(404, f"Unknown shop: {shop_name}")
+            return
+
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+
+        stats = self._get_shop_summary(shop)
+        self.wfile.write(json.dumps(stats, indent=2).encode())
+
+    def handle_aggregates(self, shop_name=None):
+        """Sales aggregates endpoint (all shops, or one shop)"""
+        shop = self.shops.get(shop_name or DEFAULT_SHOP)
+        if shop is None:
+            self.send_error(404, f"Unknown shop: {shop_name}")
+            return
+
+        # Summaries are cached by SalesAggregates; copy before adding keys
+        aggregates = dict(shop.aggregates.get_summary())
+        if shop_name is None and len(self.shops) > 1:
+            aggregates['shops'] = {shop.name: shop.aggregates.get_summary() for shop in self.shops}
+        self.send_json_response(200, aggregates)
+
+    def handle_profile(self, query):
+        """Profile the request path for ?seconds=N and return hot stacks and allocation sites"""
+        try:
+            seconds = float(query.get('seconds', ['10'])[0])
+            interval_ms = float(query.get('interval_ms', [self.profiler.interval * 1000])[0])
+        except ValueError:
+            seconds = interval_ms = 0
+        if not 0 < seconds <= self.profiler.max_seconds or not 0 < interval_ms <= 1000:
+            self.send_json_response(400, {
+                'error': f'seconds must be in (0, {self.profiler.max_seconds}] and interval_ms in (0, 1000]'
+            })
+            return
+
+        print(f"{Colors.OKCYAN}ℹ Profiling request path for {seconds}s{Colors.ENDC}")
+        try:
+            report = self.profiler.run(seconds, interval=interval_ms / 1000,
+                                       trace_memory=query.get('memory', ['1'])[0] != '0')
+        except ProfilerBusy as e:
+            self.send_json_response(409, {'error': str(e)})
+            return
+        self.send_json_response(200, report)
+
+    def _get_shop_summary(self, shop):
+        """Build the statistics summary of one shop"""
+        stats = shop.stats.get_summary()
+        stats['coalescing'] = shop.coalescer.get_summary()
+        stats['noop_updates'] = shop.noop_detector.get_summary()
+        stats['limits'] = shop.get_limits()
+        if shop.rate_limit:
+            stats['rate_limit'] = shop.rate_limit.get_summary()
+        return stats
+
     def handle_info_page(self):
         """Info page with usage instructions"""
         self.send_response(200)
@@ -140,7 +285,8 @@ class WebhookHandler(BaseHTTPRequestHandler):
         self.send_header('Content-Type', 'text/html')
         self.end_headers()
 
-        stats = self.stats.get_summary()
+        default_shop = self.shops.default
+        stats = default_shop.stats.get_summary()
         uptime_minutes = int(stats['uptime_seconds'] / 60)
 
         html = f"""
@@ -217,14 +363,19 @@ class WebhookHandler(BaseHTTPRequestHandler):
                 <div class="endpoint">
                     <strong>GET</strong> /stats - Statistics (JSON)
                 </div>
+                <div class="endpoint">
+                    <strong>GET</strong> /aggregates - Revenue, orders by state and product quantities (JSON)
+                </div>
+                {self._format_shop_endpoints()}
 
                 <h3>🔧 Configuration</h3>
                 <p><strong>Webhook URL for PrestaShop:</strong></p>
-                <code>http://localhost:{self.server.server_port}/webhook</code>
+                <code>{f'http://localhost:{self.server.server_port}/webhook' if self.server.server_port
+                       else f'http://localhost/webhook (Unix socket {self.server.server_address})'}</code>
 
-                {f'<p><strong>Webhook Secret:</strong> <code>{self.webhook_secret}</code></p>' if self.webhook_secret else ''}
+                {f'<p><strong>Webhook Secret:</strong> <code>{default_shop.secret}</code></p>' if default_shop.secret else ''}
 
-                {f'<p><strong>Log File:</strong> <code>{self.log_file_path}</code></p>' if self.log_file_path else ''}
+                {f'<p><strong>Log File:</strong> <code>{default_shop.log_file_path}</code></p>' if default_shop.log_file_path else ''}
 
                 <p style="margin-top: 30px; color: #666; font-size: 12px;">
                     Auto-refreshes every 5 seconds • Check console for real-time webhook output
@@ -241,10 +392,31 @@ class WebhookHandler(BaseHTTPRequestHandler):
             return '<li><em>No data yet</em></li>'
         return ''.join([f'<li>{k}: {v}</li>' for k, v in d.items()])
 
+    def _format_shop_endpoints(self):
+        """Format per-shop webhook endpoints as HTML"""
+        return ''.join([
+            f'<div class="endpoint"><strong>POST</strong> {shop.path} - Shop <code>{shop.name}</code> '
+            f'({shop.stats.total_requests} requests, <a href="/stats/{shop.name}">stats</a>)</div>'
+            for shop in self.shops if shop.name != DEFAULT_SHOP
+        ])
+
     def handle_webhook(self):
         """Handle webhook POST request"""
-        # Read request body
+        shop = self.shop
         content_length = int(self.headers.get('Content-Length', 0))
+
+        # Enforce the shop's body size limit before reading the body
+        if shop.max_body_bytes and content_length > shop.max_body_bytes:
+            self.print_error(f"❌ WEBHOOK REJECTED - Body too large for shop {shop.name} ({content_length} bytes)")
+            shop.stats.record_failure('body_too_large')
+            # The body is left unread, so the connection cannot be reused
+            self.close_connection = True
+            self.send_json_response(413, {
+                'error': f'Payload too large: {content_length} bytes (limit {shop.max_body_bytes})'
+            })
+            return
+
+        # Read request body
         body = self.rfile.read(content_length)
 
         # Get headers
@@ -252,13 +424,14 @@ class WebhookHandler(BaseHTTPRequestHandler):
         content_type = self.headers.get('Content-Type', '')
 
         # Validate secret if configured
-        if self.webhook_secret and secret_header != self.webhook_secret:
+        if shop.secret and secret_header != shop.secret:
             self.log_to_file('ERROR', 'Invalid webhook secret', {
-                'expected': self.webhook_secret,
+                'shop': shop.name,
+                'expected': shop.secret,
                 'received': secret_header
             })
             self.print_error("❌ WEBHOOK REJECTED - Invalid Secret")
-            self.stats.record_failure('invalid_secret')
+            shop.stats.record_failure('invalid_secret')
 
             self.send_response(403)
             self.send_cors_headers()
@@ -274,7 +447,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
         except json.JSONDecodeError as e:
             self.log_to_file('ERROR', 'Invalid JSON', {'error': str(e), 'body': body.decode('utf-8')[:200]})
             self.print_error(f"❌ INVALID JSON: {e}")
-            self.stats.record_failure('invalid_json')
+            shop.stats.record_failure('invalid_json')
 
             self.send_response(400)
             self.send_cors_headers()
@@ -284,39 +457,148 @@ class WebhookHandler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps(error).encode())
             return
 
+        # Anything but a JSON object cannot be a webhook payload
+        if not isinstance(payload, dict):
+            self.reject_invalid(self.validator.validate_envelope(payload))
+            return
+
         # Check if this is a BATCH payload or single event
         is_batch = 'batch_id' in payload and 'events' in payload
 
+        if is_batch and self.validate_mode == 'inline':
+            envelope_errors = self.validator.validate_envelope(payload)
+            if envelope_errors:
+                self.reject_invalid(envelope_errors)
+                return
+
+        events = payload.get('events', []) if is_batch else [payload]
+
+        # Enforce the shop's batch size limit
+        if shop.max_batch_events and len(events) > shop.max_batch_events:
+            self.print_error(f"❌ BATCH REJECTED - {len(events)} events exceed limit for shop {shop.name}")
+            shop.stats.record_failure('batch_too_large')
+            self.send_json_response(413, {
+                'error': f'Batch too large: {len(events)} events (limit {shop.max_batch_events})',
+                'batch_id': payload.get('batch_id')
+            })
+            return
+
+        # Token-bucket rate limiting on events/s and bytes/s (per shop and global)
+        limits = [limit for limit in (shop.rate_limit, self.rate_limit) if limit]
+        if limits:
+            admission = admit(limits, len(events), len(body))
+            if not admission.admitted:
+                self.reject_throttled(admission, len(events))
+                return
+
+        # Schema validation: inline marks invalid events as failed in `results`,
+        # async validates after the response and only reports
+        invalid = {}
+        if self.validate_mode == 'inline':
+            if is_batch:
+                invalid = self.validator.validate_events(events)
+            else:
+                errors = self.validator.validate_single(payload)
+                if errors:
+                    shop.stats.record_failure('schema_invalid')
+                    self.print_error(f"❌ WEBHOOK REJECTED - Schema validation failed ({len(errors)} errors)")
+                    self.send_json_response(400, build_failure_result(errors))
+                    return
+        elif self.validate_mode == 'async':
+            self.async_validator.submit(payload, is_batch)
+
+        # Inject latency and faults from the active profile (only this thread sleeps)
+        decision = self.faults.plan(events)
+        if decision.delay:
+            time.sleep(decision.delay)
+        self.faults.record_outcome(len(events), decision)
+        if decision.fault:
+            self.inject_fault(decision)
+            return
+
         if is_batch:
             # Handle batch payload
             batch_id = payload.get('batch_id', 'unknown')
-            events = payload.get('events', [])
 
             print(f"\n{Colors.BOLD}{Colors.OKGREEN}{'='*80}{Colors.ENDC}")
-            print(f"{Colors.BOLD}{Colors.HEADER}🔔 BATCH WEBHOOK #{self.stats.total_requests + 1}{Colors.ENDC}")
+            print(f"{Colors.BOLD}{Colors.HEADER}🔔 BATCH WEBHOOK #{shop.stats.total_requests + 1}{Colors.ENDC}")
             print(f"{Colors.BOLD}{Colors.OKGREEN}{'='*80}{Colors.ENDC}")
+            if shop.name != DEFAULT_SHOP:
+                print(f"{Colors.OKCYAN}Shop:{Colors.ENDC} {shop.name}")
             print(f"{Colors.OKCYAN}Batch ID:{Colors.ENDC} {batch_id}")
             print(f"{Colors.OKCYAN}Event Count:{Colors.ENDC} {len(events)}")
             print(f"{Colors.OKCYAN}Timestamp:{Colors.ENDC} {payload.get('timestamp', 'N/A')}")
+            if invalid:
+                print(f"{Colors.FAIL}Invalid Events:{Colors.ENDC} {len(invalid)} failed schema validation")
+
+            # Detect redundant events (same entity updated several times)
+            plan = shop.coalescer.analyze(events)
+            if plan.in_batch_collapsible or plan.window_collapsible:
+                print(f"{Colors.WARNING}Coalescible:{Colors.ENDC} {plan.in_batch_collapsible} in batch, " +
+                      f"{plan.window_collapsible} within {shop.coalescer.window_seconds}s window")
+
+            # Detect updates where nothing but ignored fields (date_upd) changed
+            changes = shop.noop_detector.analyze(events)
+            noop_count = sum(1 for paths in changes.values() if not paths)
+            if noop_count:
+                print(f"{Colors.WARNING}No-op Updates:{Colors.ENDC} {noop_count} of {len(changes)} " +
+                      f"(ignoring {', '.join(sorted(shop.noop_detector.ignored_fields))})")
+
+            # In coalesced-apply mode only the final state of each entity is applied
+            applied = plan.applied if self.coalesce_apply else range(len(events))
 
             # Display each event in the batch
-            for idx, event in enumerate(events, 1):
+            for idx in applied:
+                event = events[idx]
                 entity_type = event.get('entity_type', 'unknown')
                 action_type = event.get('action_type', 'unknown')
                 is_reverse_sync = event.get('reverse_sync', False)
 
                 # Update stats
-                self.stats.record_success(entity_type, action_type, is_reverse_sync)
+                if idx in invalid:
+                    shop.stats.record_failure('schema_invalid')
+                    print(f"\n{Colors.BOLD}📋 Event {idx + 1}/{len(events)}:{Colors.ENDC} " +
+                          f"{Colors.FAIL}invalid - {build_failure_result(invalid[idx])['error']}{Colors.ENDC}")
+                    continue
+                elif idx in decision.failed_indexes:
+                    shop.stats.record_failure('injected_failure')
+                else:
+                    shop.stats.record_success(entity_type, action_type, is_reverse_sync)
 
                 # Display event
-                print(f"\n{Colors.BOLD}📋 Event {idx}/{len(events)}:{Colors.ENDC}")
+                print(f"\n{Colors.BOLD}📋 Event {idx + 1}/{len(events)}:{Colors.ENDC}")
                 self.display_event_summary(event)
+                if idx in changes:
+                    paths = changes[idx]
+                    if paths:
+                        more = f' (+{len(paths) - 10} more)' if len(paths) > 10 else ''
+                        print(f"   Changed:      {', '.join(paths[:10])}{more}")
+                    else:
+                        print(f"   Changed:      {Colors.WARNING}nothing (no-op update){Colors.ENDC}")
 
             print(f"\n{Colors.BOLD}{Colors.OKGREEN}{'='*80}{Colors.ENDC}\n")
 
             # Log to file
             self.log_to_file('INFO', 'Batch webhook received', payload)
 
+            results = plan.build_results() if self.coalesce_apply else [{'success': True} for _ in events]
+            decision.apply_to_results(results)
+            # Validation failures take precedence over coalescing and injected faults
+            for idx, errors in invalid.items():
+                results[idx] = build_failure_result(errors)
+            if self.coalesce_apply:
+                # Superseded events share the outcome of the event carrying the final state
+                for idx, final_idx in enumerate(plan.final_index):
+                    if idx not in invalid and (final_idx in decision.failed_indexes or final_idx in invalid):
+                        results[idx] = results[final_idx]
+
+            # Aggregate every accepted event; failed ones will be retried by PrestaShop.
+            # In coalesced-apply mode superseded events are acknowledged but not applied
+            accepted = [idx for idx, result in enumerate(results) if result['success']]
+            applied_indexes = [idx for idx in plan.applied if results[idx]['success']] if self.coalesce_apply else accepted
+            shop.aggregates.apply_events([events[idx] for idx in applied_indexes])
+            shop.noop_detector.record(events, changes, accepted)
+
             # Send success response for batch
             self.send_response(200)
             self.send_cors_headers()
@@ -328,7 +610,8 @@ class WebhookHandler(BaseHTTPRequestHandler):
                 'batch_id': batch_id,
                 'events_processed': len(events),
                 'received_at': datetime.now().isoformat(),
-                'results': [{'success': True} for _ in events]
+                'results': results,
+                'coalescing': plan.to_dict()
             }
             self.wfile.write(json.dumps(response).encode())
         else:
@@ -337,6 +620,11 @@ class WebhookHandler(BaseHTTPRequestHandler):
             action_type = payload.get('action_type', 'unknown')
             is_reverse_sync = payload.get('reverse_sync', False)
 
+            if decision.failed_indexes:
+                shop.stats.record_failure('injected_failure')
+                self.send_json_response(500, {'error': 'Injected failure (fault profile)'})
+                return
+
             # Display webhook
             self.display_webhook(payload)
 
@@ -344,7 +632,8 @@ class WebhookHandler(BaseHTTPRequestHandler):
             self.log_to_file('INFO', 'Webhook received', payload)
 
             # Update stats
-            self.stats.record_success(entity_type, action_type, is_reverse_sync)
+            shop.stats.record_success(entity_type, action_type, is_reverse_sync)
+            shop.aggregates.apply_events([payload])
 
             # Send success response
             self.send_response(200)
@@ -421,6 +710,60 @@ class WebhookHandler(BaseHTTPRequestHandler):
         if 'change_summary' in event:
             print(f"   {Colors.BOLD}Summary:{Colors.ENDC} {event['change_summary']}")
 
+    def inject_fault(self, decision):
+        """Answer a request with a whole-request fault from the active profile"""
+        self.shop.stats.record_failure(decision.fault)
+
+        if decision.fault == FAULT_RESET:
+            # SO_LINGER with zero timeout makes close() send a TCP RST
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.connection.close()
+            self.close_connection = True
+        elif decision.fault == FAULT_TIMEOUT:
+            # Hold the connection past the client's timeout, then drop it unanswered
+            time.sleep(decision.timeout_seconds)
+            self.close_connection = True
+        elif decision.fault == FAULT_ERROR:
+            self.send_json_response(decision.error_status, {
+                'error': f'Injected HTTP {decision.error_status} (fault profile {self.faults.name})'
+            })
+
+    def reject_invalid(self, errors):
+        """Answer a payload whose envelope failed schema validation"""
+        self.validator.record_invalid_envelope(errors)
+        self.shop.stats.record_failure('invalid_envelope')
+        self.print_error(f"❌ INVALID PAYLOAD: {errors[0]['path'] or 'payload'}: {errors[0]['message']}")
+        self.send_json_response(400, {'error': 'Invalid payload', 'validation_errors': errors})
+
+    def reject_throttled(self, admission, event_count):
+        """Answer a request rejected by the rate limiter"""
+        shop = self.shop
+        if admission.oversize:
+            shop.stats.record_failure('rate_limit_oversize')
+            self.send_json_response(413, {
+                'error': f'Request exceeds rate limit burst capacity ({admission.limited_by})'
+            })
+            return
+
+        shop.stats.record_failure('throttled')
+        print(f"{Colors.WARNING}⏳ THROTTLED{Colors.ENDC} {event_count} events " +
+              f"({admission.limited_by}, retry after {admission.retry_after:.2f}s)")
+        self.send_json_response(429, {
+            'error': 'Rate limit exceeded',
+            'limited_by': admission.limited_by,
+            'retry_after_seconds': round(admission.retry_after, 3)
+        }, headers={'Retry-After': admission.retry_after_header})
+
+    def send_json_response(self, status, data, headers=None):
+        """Send a compact JSON response with CORS headers"""
+        self.send_response(status)
+        self.send_cors_headers()
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
+
     def send_cors_headers(self):
         """Send CORS headers for cross-origin requests"""
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -439,11 +782,11 @@ class WebhookHandler(BaseHTTPRequestHandler):
         # Display header with appropriate styling
         if is_reverse_sync:
             print(f"\n{Colors.BOLD}{Colors.OKCYAN}{'='*80}{Colors.ENDC}")
-            print(f"{Colors.BOLD}{Colors.HEADER}🔄 REVERSE SYNC WEBHOOK #{self.stats.total_requests + 1}{Colors.ENDC}")
+            print(f"{Colors.BOLD}{Colors.HEADER}🔄 REVERSE SYNC WEBHOOK #{self.shop.stats.total_requests + 1}{Colors.ENDC}")
             print(f"{Colors.BOLD}{Colors.OKCYAN}{'='*80}{Colors.ENDC}")
         else:
             print(f"\n{Colors.BOLD}{Colors.OKGREEN}{'='*80}{Colors.ENDC}")
-            print(f"{Colors.BOLD}{Colors.HEADER}🔔 WEBHOOK #{self.stats.total_requests + 1}{Colors.ENDC}")
+            print(f"{Colors.BOLD}{Colors.HEADER}🔔 WEBHOOK #{self.shop.stats.total_requests + 1}{Colors.ENDC}")
             print(f"{Colors.BOLD}{Colors.OKGREEN}{'='*80}{Colors.ENDC}")
 
         print(f"{Colors.OKCYAN}Timestamp:{Colors.ENDC} {timestamp}")
@@ -509,28 +852,31 @@ class WebhookHandler(BaseHTTPRequestHandler):
 
     def log_to_file(self, level, message, data=None):
         """Log to file if file logger is configured (unbuffered)"""
-        if self.file_logger:
+        file_logger = self.shop.file_logger if self.shop else None
+        if file_logger:
             log_entry = {
                 'timestamp': datetime.now().isoformat(),
                 'level': level,
                 'message': message,
                 'data': data
             }
-            self.file_logger.info(json.dumps(log_entry, indent=2))
+            file_logger.info(json.dumps(log_entry, indent=2))
             # Force flush for immediate write
-            for handler in self.file_logger.handlers:
+            for handler in file_logger.handlers:
                 handler.flush()
 
     def log_message(self, format, *args):
         """Override to suppress default request logging"""
         # Only log errors
-        if args[1] != '200':
+        if len(args) > 1 and args[1] != '200':
             super().log_message(format, *args)
 
-def setup_file_logging(log_file_path):
+def setup_file_logging(log_file_path, logger_name='webhook_logger'):
     """Setup rotating file logger with unbuffered output"""
-    logger = logging.getLogger('webhook_logger')
+    logger = logging.getLogger(logger_name)
     logger.setLevel(logging.INFO)
+    # Per-shop loggers are children of webhook_logger: keep each file isolated
+    logger.propagate = False
 
     # Create directory if it doesn't exist
     log_dir = os.path.dirname(log_file_path)
@@ -556,8 +902,7 @@ def setup_file_logging(log_file_path):
     return logger
 
 def get_local_ip():
-    """Get local IP address for display"""
-    import socket
+    """Get local IP address for display (routing lookup; only with --show-lan-ip)"""
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
@@ -567,37 +912,123 @@ def get_local_ip():
     except:
         return "localhost"
 
-def run_server(port=5000, secret=None, log_file=None):
-    """Run webhook receiver server"""
-
-    WebhookHandler.webhook_secret = secret
+def report_async_invalid(payload, failures):
+    """Print invalid payloads found by the background validator"""
+    label = payload.get('batch_id', 'single event') if isinstance(payload, dict) else 'payload'
+    print(f"{Colors.FAIL}⚠ SCHEMA: {len(failures)} invalid in {label}{Colors.ENDC}")
+    for errors in list(failures.values())[:5]:
+        for error in errors[:3]:
+            print(f"   {Colors.FAIL}{error['path'] or 'payload'}: {error['message']}{Colors.ENDC}")
+
+def report_async_error(payload, error):
+    """Print payloads the background validator could not check"""
+    label = payload.get('batch_id', 'single event') if isinstance(payload, dict) else 'payload'
+    print(f"{Colors.FAIL}✗ SCHEMA: validator error on {label}: {type(error).__name__}: {error}{Colors.ENDC}")
+
+def build_shop(name, secret=None, log_file=None, coalesce_window=5.0,
+               max_batch_events=None, max_body_bytes=None,
+               rate_limit_events=None, rate_limit_bytes=None, rate_limit_burst=1.0,
+               diff_ignore_fields=DEFAULT_IGNORED_FIELDS):
+    """Create a shop context with its own stats, coalescer, aggregates, rate limit and log file"""
+    rate_limit = None
+    if rate_limit_events or rate_limit_bytes:
+        rate_limit = RateLimit(name, rate_limit_events, rate_limit_bytes, burst_seconds=rate_limit_burst)
+
+    shop = ShopContext(
+        name,
+        secret=secret,
+        stats=WebhookStats(),
+        coalescer=BatchCoalescer(window_seconds=coalesce_window),
+        aggregates=SalesAggregates(),
+        noop_detector=NoopDetector(diff_ignore_fields),
+        max_batch_events=max_batch_events,
+        max_body_bytes=max_body_bytes,
+        rate_limit=rate_limit
+    )
 
     # Setup file logging if specified
     if log_file:
-        WebhookHandler.file_logger = setup_file_logging(log_file)
-        WebhookHandler.log_file_path = os.path.abspath(log_file)
-        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Logging to file: {Colors.BOLD}{WebhookHandler.log_file_path}{Colors.ENDC}")
-
-    server_address = ('0.0.0.0', port)  # Listen on all interfaces
-    httpd = HTTPServer(server_address, WebhookHandler)
+        logger_name = 'webhook_logger' if name == DEFAULT_SHOP else f'webhook_logger.{name}'
+        shop.file_logger = setup_file_logging(log_file, logger_name)
+        shop.log_file_path = os.path.abspath(log_file)
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Logging to file: {Colors.BOLD}{shop.log_file_path}{Colors.ENDC}" +
+              ('' if name == DEFAULT_SHOP else f" (shop {name})"))
+
+    return shop
+
+def run_server(port=5000, secret=None, log_file=None, coalesce_window=5.0, coalesce_apply=False,
+               shops_config=None, fault_profile=None, fault_profiles_file=None,
+               rate_limit_events=None, rate_limit_bytes=None, rate_limit_burst=1.0,
+               validate='async', diff_ignore_fields=DEFAULT_IGNORED_FIELDS, profile=False,
+               unix_socket=None, show_lan_ip=False):
+    """Run webhook receiver server"""
 
-    local_ip = get_local_ip()
+    WebhookHandler.coalesce_apply = coalesce_apply
+    WebhookHandler.validate_mode = validate
+    if profile:
+        WebhookHandler.profiler = RequestProfiler()
+    if validate == 'async':
+        WebhookHandler.async_validator = AsyncValidator(WebhookHandler.validator, on_invalid=report_async_invalid,
+                                                        on_error=report_async_error)
+    if fault_profile:
+        WebhookHandler.faults = load_fault_profile(fault_profile, fault_profiles_file)
+    if rate_limit_events or rate_limit_bytes:
+        WebhookHandler.rate_limit = RateLimit('global', rate_limit_events, rate_limit_bytes,
+                                              burst_seconds=rate_limit_burst)
+
+    shops = ShopRegistry()
+    shops.register(build_shop(DEFAULT_SHOP, secret=secret, log_file=log_file, coalesce_window=coalesce_window,
+                              diff_ignore_fields=diff_ignore_fields))
+    if shops_config:
+        for name, options in load_shops_config(shops_config).items():
+            shops.register(build_shop(name, coalesce_window=coalesce_window,
+                                      rate_limit_burst=rate_limit_burst,
+                                      diff_ignore_fields=diff_ignore_fields, **options))
+    WebhookHandler.shops = shops
+
+    if unix_socket:
+        # Replace a stale socket left by a previous run, never a regular file
+        if os.path.exists(unix_socket):
+            if not stat.S_ISSOCK(os.stat(unix_socket).st_mode):
+                print(f"{Colors.FAIL}✗ {unix_socket} exists and is not a socket{Colors.ENDC}")
+                sys.exit(1)
+            os.unlink(unix_socket)
+        httpd = WebhookUnixHTTPServer(unix_socket, WebhookHandler)
+        base_url = 'http://localhost'
+    else:
+        server_address = ('0.0.0.0', port)  # Listen on all interfaces
+        httpd = WebhookHTTPServer(server_address, WebhookHandler)
+        base_url = f'http://localhost:{port}'
 
     print(f"\n{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}")
     print(f"{Colors.BOLD}{Colors.HEADER}   Odoo Sales Sync - Debug Webhook Server{Colors.ENDC}")
     print(f"{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}\n")
 
-    print(f"{Colors.OKGREEN}✓{Colors.ENDC} Server running on port {Colors.BOLD}{port}{Colors.ENDC}")
-    print(f"\n{Colors.BOLD}Access from:{Colors.ENDC}")
-    print(f"  • Windows (localhost): {Colors.BOLD}http://localhost:{port}{Colors.ENDC}")
-    print(f"  • WSL: {Colors.BOLD}http://localhost:{port}{Colors.ENDC}")
-    print(f"  • Local network: {Colors.BOLD}http://{local_ip}:{port}{Colors.ENDC}")
+    if unix_socket:
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Server listening on Unix socket {Colors.BOLD}{unix_socket}{Colors.ENDC}")
+        print(f"\n{Colors.BOLD}Access with:{Colors.ENDC}")
+        print(f"  • curl: {Colors.BOLD}curl --unix-socket {unix_socket} {base_url}/health{Colors.ENDC}")
+        print(f"  • PrestaShop: set ODOO_SALES_SYNC_UNIX_SOCKET to {Colors.BOLD}{unix_socket}{Colors.ENDC}")
+    else:
+        print(f"{Colors.OKGREEN}✓{Colors.ENDC} Server running on port {Colors.BOLD}{port}{Colors.ENDC}")
+        print(f"\n{Colors.BOLD}Access from:{Colors.ENDC}")
+        print(f"  • Windows (localhost): {Colors.BOLD}http://localhost:{port}{Colors.ENDC}")
+        print(f"  • WSL: {Colors.BOLD}http://localhost:{port}{Colors.ENDC}")
+        if show_lan_ip:
+            print(f"  • Local network: {Colors.BOLD}http://{get_local_ip()}:{port}{Colors.ENDC}")
 
     print(f"\n{Colors.BOLD}Endpoints:{Colors.ENDC}")
-    print(f"  • Webhook: {Colors.BOLD}http://localhost:{port}/webhook{Colors.ENDC}")
-    print(f"  • Health check: {Colors.BOLD}http://localhost:{port}/health{Colors.ENDC}")
-    print(f"  • Statistics: {Colors.BOLD}http://localhost:{port}/stats{Colors.ENDC}")
-    print(f"  • Info page: {Colors.BOLD}http://localhost:{port}/{Colors.ENDC}")
+    print(f"  • Webhook: {Colors.BOLD}{base_url}/webhook{Colors.ENDC}")
+    print(f"  • Health check: {Colors.BOLD}{base_url}/health{Colors.ENDC}")
+    print(f"  • Statistics: {Colors.BOLD}{base_url}/stats{Colors.ENDC}")
+    print(f"  • Sales aggregates: {Colors.BOLD}{base_url}/aggregates{Colors.ENDC}")
+    if profile:
+        print(f"  • Profiler: {Colors.BOLD}{base_url}/debug/profile?seconds=10{Colors.ENDC}")
+    for shop in shops:
+        if shop.name != DEFAULT_SHOP:
+            print(f"  • Shop {shop.name}: {Colors.BOLD}{base_url}{shop.path}{Colors.ENDC}" +
+                  f" (secret: {'ENABLED' if shop.secret else 'DISABLED'})")
+    print(f"  • Info page: {Colors.BOLD}{base_url}/{Colors.ENDC}")
 
     if secret:
         print(f"\n{Colors.WARNING}⚠{Colors.ENDC}  Secret validation: {Colors.BOLD}ENABLED{Colors.ENDC}")
@@ -605,8 +1036,23 @@ def run_server(port=5000, secret=None, log_file=None):
     else:
         print(f"\n{Colors.OKCYAN}ℹ{Colors.ENDC}  Secret validation: {Colors.BOLD}DISABLED{Colors.ENDC}")
 
+    mode = 'APPLY FINAL STATE ONLY' if coalesce_apply else 'REPORT ONLY'
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  Coalescing: {Colors.BOLD}{mode}{Colors.ENDC} (window: {coalesce_window}s)")
+
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  Schema validation: {Colors.BOLD}{validate.upper()}{Colors.ENDC}")
+    print(f"{Colors.OKCYAN}ℹ{Colors.ENDC}  No-op detection ignores: " +
+          f"{Colors.BOLD}{', '.join(diff_ignore_fields) or '(nothing)'}{Colors.ENDC}")
+
+    if WebhookHandler.faults.is_active:
+        print(f"{Colors.WARNING}⚠{Colors.ENDC}  Fault injection: {Colors.BOLD}{fault_profile}{Colors.ENDC}")
+
+    if WebhookHandler.rate_limit:
+        print(f"{Colors.WARNING}⚠{Colors.ENDC}  Rate limit: {Colors.BOLD}" +
+              f"{rate_limit_events or '∞'} events/s, {rate_limit_bytes or '∞'} bytes/s{Colors.ENDC}" +
+              f" (burst: {rate_limit_burst}s)")
+
     print(f"\n{Colors.BOLD}Configure PrestaShop module with:{Colors.ENDC}")
-    print(f"   Webhook URL: http://localhost:{port}/webhook")
+    print(f"   Webhook URL: {base_url}/webhook")
     if secret:
         print(f"   Webhook Secret: {secret}")
 
@@ -618,11 +1064,15 @@ def run_server(port=5000, secret=None, log_file=None):
     except KeyboardInterrupt:
         print(f"\n\n{Colors.WARNING}Shutting down server...{Colors.ENDC}")
         httpd.shutdown()
+        httpd.server_close()
         print(f"{Colors.OKGREEN}✓ Server stopped{Colors.ENDC}")
-        stats = WebhookHandler.stats.get_summary()
-        print(f"{Colors.OKGREEN}✓ Total webhooks received: {stats['total_requests']}{Colors.ENDC}")
-        print(f"{Colors.OKGREEN}✓ Successful: {stats['successful']}{Colors.ENDC}")
-        print(f"{Colors.FAIL}✗ Failed: {stats['failed']}{Colors.ENDC}\n")
+        for shop in shops:
+            stats = shop.stats.get_summary()
+            if shop.name != DEFAULT_SHOP:
+                print(f"{Colors.BOLD}Shop {shop.name}:{Colors.ENDC}")
+            print(f"{Colors.OKGREEN}✓ Total webhooks received: {stats['total_requests']}{Colors.ENDC}")
+            print(f"{Colors.OKGREEN}✓ Successful: {stats['successful']}{Colors.ENDC}")
+            print(f"{Colors.FAIL}✗ Failed: {stats['failed']}{Colors.ENDC}\n")
 
 def main():
     """Main entry point"""
@@ -635,11 +1085,21 @@ Examples:
   %(prog)s --port 8000
   %(prog)s --port 5000 --secret my_secret_key
   %(prog)s --port 5000 --log-file webhooks.log
+  %(prog)s --port 5000 --coalesce-window 10 --coalesce-apply
+  %(prog)s --port 5000 --shops-config shops.json
+  %(prog)s --port 5000 --fault-profile flaky
+  %(prog)s --port 5000 --fault-profiles-file profiles.json --fault-profile black_friday
+  %(prog)s --port 5000 --rate-limit-events 100 --rate-limit-bytes 2000000
+  %(prog)s --port 5000 --validate async
+  %(prog)s --port 5000 --diff-ignore-fields date_upd,date_add
+  %(prog)s --port 5000 --profile
+  %(prog)s --unix-socket /tmp/odoo_webhook.sock
 
 The server will:
   - Display all received webhooks in colored, formatted output
   - Log all webhooks to file (if --log-file specified)
   - Provide statistics via /stats endpoint
+  - Keep revenue, order and product totals via /aggregates endpoint
   - Be accessible from both Windows and WSL
         """
     )
@@ -665,9 +1125,115 @@ The server will:
         help='Log file path for webhook data (optional, with rotation)'
     )
 
+    parser.add_argument(
+        '--coalesce-window',
+        type=float,
+        default=5.0,
+        help='Time window in seconds to detect redundant events across batches (default: 5)'
+    )
+
+    parser.add_argument(
+        '--coalesce-apply',
+        action='store_true',
+        help='Apply only the final state of each entity per batch (results stay per-index)'
+    )
+
+    parser.add_argument(
+        '--shops-config',
+        type=str,
+        default=None,
+        help='JSON file with per-shop secrets, log files and limits, served at /webhook/<shop> (optional)'
+    )
+
+    parser.add_argument(
+        '--fault-profile',
+        type=str,
+        default=None,
+        help='Inject latency and failures into /webhook responses. Built-in: ' +
+             ', '.join(BUILTIN_PROFILES) + ' (optional)'
+    )
+
+    parser.add_argument(
+        '--fault-profiles-file',
+        type=str,
+        default=None,
+        help='JSON file with custom fault profiles under "profiles" (optional)'
+    )
+
+    parser.add_argument(
+        '--rate-limit-events',
+        type=float,
+        default=None,
+        help='Global limit on webhook events per second, answered with 429 + Retry-After (optional)'
+    )
+
+    parser.add_argument(
+        '--rate-limit-bytes',
+        type=float,
+        default=None,
+        help='Global limit on request body bytes per second (optional)'
+    )
+
+    parser.add_argument(
+        '--rate-limit-burst',
+        type=float,
+        default=1.0,
+        help='Bucket capacity in seconds of traffic for all rate limits (default: 1)'
+    )
+
+    parser.add_argument(
+        '--validate',
+        choices=['off', 'inline', 'async'],
+        default='async',
+        help='Payload schema validation: per-event results (inline), after the ack (async) or off (default: async)'
+    )
+
+    parser.add_argument(
+        '--diff-ignore-fields',
+        type=str,
+        default=','.join(DEFAULT_IGNORED_FIELDS),
+        help='Comma-separated fields ignored when detecting no-op updates (default: date_upd)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Enable GET /debug/profile?seconds=N (sampled hot stacks and tracemalloc allocation sites)'
+    )
+
+    parser.add_argument(
+        '--unix-socket',
+        type=str,
+        default=None,
+        help='Listen on this Unix domain socket path instead of TCP (co-located PrestaShop)'
+    )
+
+    parser.add_argument(
+        '--show-lan-ip',
+        action='store_true',
+        help='Look up and print the local network address at startup (routing lookup toward 8.8.8.8)'
+    )
+
     args = parser.parse_args()
 
-    run_server(port=args.port, secret=args.secret, log_file=args.log_file)
+    run_server(
+        port=args.port,
+        secret=args.secret,
+        log_file=args.log_file,
+        coalesce_window=args.coalesce_window,
+        coalesce_apply=args.coalesce_apply,
+        shops_config=args.shops_config,
+        fault_profile=args.fault_profile,
+        fault_profiles_file=args.fault_profiles_file,
+        rate_limit_events=args.rate_limit_events,
+        rate_limit_bytes=args.rate_limit_bytes,
+        rate_limit_burst=args.rate_limit_burst,
+        validate=args.validate,
+        diff_ignore_fields=[field.strip() for field in args.diff_ignore_fields.split(',') if field.strip()],
+        profile=args.profile,
+        unix_socket=args.unix_socket,
+        show_lan_ip=args.show_lan_ip
+    )
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Structural Diff of Update Events
+
+Many `updated` events change nothing that matters: `date_upd` moves while
+every other field of `before_data` and `after_data` stays the same. This
+module compares both snapshots, skipping configurable ignored fields, and
+classifies each event as a no-op or as changed (with the changed field
+paths, e.g. `order_details[2].product_quantity`). The no-op ratio is kept per
+hook so wasted sync traffic from OdooSalesHookTracker can be quantified.
+
+OdooSalesEventDetector only fills `after_data`, so module traffic arrives
+with `before_data: null`. For those events the `after_data` last accepted
+for the same entity (entity_type, entity_id) is used as the before snapshot,
+like the last-snapshot fallback of webhook_aggregates.py. Only accepted
+events are counted and stored, so a retried event is not diffed against
+its own failed copy. Snapshots are kept for the most recently updated
+entities only (LRU, DEFAULT_MAX_ENTITIES).
+
+Unchanged subtrees are skipped with a single `==` comparison, which runs in
+C and stops at the first difference, so large `order_details` arrays are
+only walked field by field where they actually differ.
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from webhook_coalescing import entity_key
+
+DEFAULT_IGNORED_FIELDS = ('date_upd',)
+# Entities whose last snapshot is kept for events without before_data
+DEFAULT_MAX_ENTITIES = 10000
+
+_MISSING = object()
+_INDEX_PATTERN = re.compile(r'\[\d+\]')
+
+
+def diff_paths(before, after, ignored_fields=frozenset(), path=''):
+    """Return the paths that differ between two JSON values, ignoring some field names"""
+    changes = []
+    _diff(before, after, ignored_fields, path, changes)
+    return changes
+
+
+def _diff(before, after, ignored_fields, path, changes):
+    if before == after:
+        return
+    if type(before) is dict and type(after) is dict:
+        # Keys in payload order: before_data first, then keys only in after_data
+        for key in [*before, *(key for key in after if key not in before)]:
+            if key in ignored_fields:
+                continue
+            _diff(before.get(key, _MISSING), after.get(key, _MISSING), ignored_fields,
+                  f'{path}.{key}' if path else key, changes)
+    elif type(before) is list and type(after) is list:
+        if len(before) != len(after):
+            changes.append(path)
+        for idx in range(min(len(before), len(after))):
+            _diff(before[idx], after[idx], ignored_fields, f'{path}[{idx}]', changes)
+    else:
+        changes.append(path or '.')
+
+
+class NoopDetector:
+    """Classify update events as no-op or changed and keep ratios per hook"""
+
+    def __init__(self, ignored_fields=DEFAULT_IGNORED_FIELDS, max_entities=DEFAULT_MAX_ENTITIES):
+        self.ignored_fields = frozenset(ignored_fields)
+        self.max_entities = max_entities
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.noop = 0
+        self.from_last_snapshot = 0
+        self.evicted = 0
+        self.by_hook = {}
+        self.changed_paths = {}
+        # Last accepted after_data per entity (LRU), used when an event has no before_data
+        self._last_by_entity = OrderedDict()
+
+    def analyze(self, events):
+        """Return {index: changed paths} for events with a before and an after snapshot ([] = no-op)
+
+        Nothing is stored or counted here: call record() with the accepted
+        indexes once the outcome of each event is known.
+        """
+        changes = {}
+        # Later events of the same batch are diffed against earlier ones
+        batch_snapshots = {}
+        with self._lock:
+            for idx, event in enumerate(events):
+                key = entity_key(event)
+                before = event.get('before_data')
+                after = event.get('after_data')
+                # PHP json_encode() sends an empty snapshot as []
+                if not (before and type(before) is dict) and key is not None:
+                    before = batch_snapshots.get(key, self._last_by_entity.get(key))
+                if before and after and type(before) is dict and type(after) is dict:
+                    changes[idx] = diff_paths(before, after, self.ignored_fields)
+                if key is not None:
+                    batch_snapshots[key] = after if after and type(after) is dict else None
+        return changes
+
+    def record(self, events, changes, accepted):
+        """Count the analyzed events that were accepted and keep their after_data"""
+        with self._lock:
+            for idx in accepted:
+                event = events[idx]
+                key = entity_key(event)
+                if key is not None:
+                    after = event.get('after_data')
+                    if after and type(after) is dict:
+                        self._last_by_entity[key] = after
+                        self._last_by_entity.move_to_end(key)
+                        if len(self._last_by_entity) > self.max_entities:
+                            self._last_by_entity.popitem(last=False)
+                            self.evicted += 1
+                    else:
+                        self._last_by_entity.pop(key, None)
+
+                paths = changes.get(idx)
+                if paths is None:
+                    continue
+                before = event.get('before_data')
+                if not (before and type(before) is dict):
+                    self.from_last_snapshot += 1
+                hook_name = event.get('hook_name')
+                hook = self.by_hook.setdefault(hook_name if type(hook_name) is str else 'unknown', [0, 0])
+                hook[0] += 1
+                self.updates += 1
+                if not paths:
+                    hook[1] += 1
+                    self.noop += 1
+                for path in set(_INDEX_PATTERN.sub('[]', path) for path in paths):
+                    self.changed_paths[path] = self.changed_paths.get(path, 0) + 1
+
+    def get_summary(self):
+        with self._lock:
+            top_paths = sorted(self.changed_paths.items(), key=lambda item: -item[1])[:20]
+            return {
+                'ignored_fields': sorted(self.ignored_fields),
+                'updates': self.updates,
+                'noop': self.noop,
+                'noop_ratio': round(self.noop / self.updates, 4) if self.updates else 0.0,
+                'from_last_snapshot': self.from_last_snapshot,
+                'tracked_entities': len(self._last_by_entity),
+                'evicted_entities': self.evicted,
+                'by_hook': {
+                    hook: {'updates': updates, 'noop': noop, 'noop_ratio': round(noop / updates, 4)}
+                    for hook, (updates, noop) in sorted(self.by_hook.items(), key=lambda item: -item[1][1])
+                },
+                'top_changed_paths': dict(top_paths)
+            }
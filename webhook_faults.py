@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Fault Injection Profiles for the Debug Webhook Server
+
+Makes the debug server behave like a struggling Odoo instance so that
+OdooSalesWebhookClient timeouts and OdooSalesRetryManager backoff can be
+sized against realistic conditions.
+
+A profile is a declarative JSON object:
+
+    {
+        "seed": 42,
+        "latency": {
+            "base": {"type": "fixed", "ms": 20},
+            "per_event": {
+                "default": {"type": "normal", "mean_ms": 15, "stddev_ms": 5},
+                "order": {"type": "long_tail", "median_ms": 40, "sigma": 1.2, "max_ms": 20000}
+            }
+        },
+        "partial_failure_rate": {"default": 0.01, "order": 0.05},
+        "timeout_rate": 0.005,
+        "timeout_seconds": 45,
+        "reset_rate": 0.005,
+        "error_burst": {"rate": 0.01, "length": 20, "status": 503}
+    }
+
+Latency is `base` once per request plus `per_event` for every event of the
+batch (Odoo processes events sequentially). Every fault that is injected is
+counted, and a per-second timeline of completed versus faulted events is kept
+so a load test can show how client throughput drops under each profile.
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+
+# Built-in profiles, usable without a profiles file
+BUILTIN_PROFILES = {
+    'healthy': {},
+    'slow': {
+        'latency': {
+            'base': {'type': 'fixed', 'ms': 50},
+            'per_event': {'default': {'type': 'normal', 'mean_ms': 20, 'stddev_ms': 5}}
+        }
+    },
+    'long_tail': {
+        'latency': {
+            'per_event': {
+                'default': {'type': 'long_tail', 'median_ms': 10, 'sigma': 1.0, 'max_ms': 10000},
+                'order': {'type': 'long_tail', 'median_ms': 40, 'sigma': 1.5, 'max_ms': 30000}
+            }
+        }
+    },
+    'flaky': {
+        'latency': {'base': {'type': 'normal', 'mean_ms': 80, 'stddev_ms': 30}},
+        'partial_failure_rate': 0.05,
+        'reset_rate': 0.01,
+        'timeout_rate': 0.01,
+        'timeout_seconds': 35
+    },
+    'overloaded': {
+        'latency': {
+            'base': {'type': 'long_tail', 'median_ms': 500, 'sigma': 0.8, 'max_ms': 25000},
+            'per_event': {'default': {'type': 'fixed', 'ms': 30}}
+        },
+        'partial_failure_rate': 0.02,
+        'error_burst': {'rate': 0.05, 'length': 10, 'status': 503}
+    }
+}
+
+PROFILE_KEYS = ('seed', 'latency', 'partial_failure_rate', 'timeout_rate',
+                'timeout_seconds', 'reset_rate', 'error_burst')
+
+# Fault kinds reported in statistics
+FAULT_TIMEOUT = 'timeout'
+FAULT_RESET = 'connection_reset'
+FAULT_ERROR = 'error_burst'
+FAULT_PARTIAL = 'partial_failure'
+
+TIMELINE_SECONDS = 600
+
+
+def compile_distribution(spec, rng):
+    """Compile a latency distribution spec into a callable returning seconds"""
+    dist_type = spec.get('type', 'fixed')
+
+    if dist_type == 'fixed':
+        seconds = spec.get('ms', 0) / 1000.0
+        return lambda: seconds
+
+    if dist_type == 'normal':
+        mean = spec.get('mean_ms', 0) / 1000.0
+        stddev = spec.get('stddev_ms', 0) / 1000.0
+        return lambda: max(0.0, rng.gauss(mean, stddev))
+
+    if dist_type == 'long_tail':
+        # Log-normal around the median, capped to keep tests bounded
+        mu = math.log(max(spec.get('median_ms', 1), 0.001) / 1000.0)
+        sigma = spec.get('sigma', 1.0)
+        cap = spec.get('max_ms', 60000) / 1000.0
+        return lambda: min(cap, rng.lognormvariate(mu, sigma))
+
+    raise ValueError(f'Unknown latency distribution type: {dist_type!r}')
+
+
+def compile_rates(value, name):
+    """Normalize a rate given as a number or {entity_type: rate} dict"""
+    if value is None:
+        return {}
+    if isinstance(value, (int, float)):
+        value = {'default': value}
+    for key, rate in value.items():
+        if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            raise ValueError(f'{name}[{key!r}] must be a number between 0 and 1')
+    return dict(value)
+
+
+def _entity_type(event):
+    # Malformed events may carry an object or array entity_type (unhashable)
+    entity_type = event.get('entity_type', 'unknown')
+    return entity_type if type(entity_type) is str else 'unknown'
+
+
+class FaultDecision:
+    """Faults to inject into one request"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.fault = None
+        self.error_status = None
+        self.timeout_seconds = 0.0
+        self.failed_indexes = set()
+
+    def apply_to_results(self, results):
+        """Mark injected per-event failures in a `results` array"""
+        for idx in self.failed_indexes:
+            results[idx] = {'success': False, 'error': 'Injected failure (fault profile)'}
+        return results
+
+
+class FaultInjector:
+    """Draw faults from a compiled profile and record what was injected"""
+
+    def __init__(self, name, profile):
+        unknown = set(profile) - set(PROFILE_KEYS)
+        if unknown:
+            raise ValueError(f'Unknown keys in fault profile {name!r}: {", ".join(sorted(unknown))}')
+
+        self.name = name
+        self.profile = profile
+        self._rng = random.Random(profile.get('seed'))
+        self._lock = threading.Lock()
+
+        latency = profile.get('latency', {})
+        base = latency.get('base')
+        self._base_latency = compile_distribution(base, self._rng) if base else None
+        self._event_latency = {
+            entity_type: compile_distribution(spec, self._rng)
+            for entity_type, spec in latency.get('per_event', {}).items()
+        }
+
+        self._failure_rates = compile_rates(profile.get('partial_failure_rate'), 'partial_failure_rate')
+        self._timeout_rate = profile.get('timeout_rate', 0.0)
+        self._timeout_seconds = profile.get('timeout_seconds', 60)
+        self._reset_rate = profile.get('reset_rate', 0.0)
+
+        burst = profile.get('error_burst') or {}
+        self._burst_rate = burst.get('rate', 0.0)
+        self._burst_length = burst.get('length', 1)
+        self._burst_status = burst.get('status', 503)
+        self._burst_remaining = 0
+
+        self.requests = 0
+        self.faults = {FAULT_TIMEOUT: 0, FAULT_RESET: 0, FAULT_ERROR: 0, FAULT_PARTIAL: 0}
+        self.partial_by_entity_type = {}
+        self.injected_latency_seconds = 0.0
+        self.max_injected_latency_seconds = 0.0
+        # Per-second buckets: [second, events_completed, events_faulted]
+        self._timeline = deque(maxlen=TIMELINE_SECONDS)
+
+    @property
+    def is_active(self):
+        return bool(self.profile)
+
+    def plan(self, events):
+        """Decide which faults to inject for a list of events"""
+        decision = FaultDecision()
+
+        with self._lock:
+            self.requests += 1
+            rng = self._rng
+
+            if self._base_latency:
+                decision.delay += self._base_latency()
+            default_latency = self._event_latency.get('default')
+            default_rate = self._failure_rates.get('default', 0.0)
+
+            for idx, event in enumerate(events):
+                entity_type = _entity_type(event)
+                latency = self._event_latency.get(entity_type, default_latency)
+                if latency:
+                    decision.delay += latency()
+                rate = self._failure_rates.get(entity_type, default_rate)
+                if rate and rng.random() < rate:
+                    decision.failed_indexes.add(idx)
+
+            # Whole-request faults: an active burst wins, then resets, timeouts, new bursts
+            if self._burst_remaining > 0:
+                self._burst_remaining -= 1
+                decision.fault = FAULT_ERROR
+            elif self._reset_rate and rng.random() < self._reset_rate:
+                decision.fault = FAULT_RESET
+            elif self._timeout_rate and rng.random() < self._timeout_rate:
+                decision.fault = FAULT_TIMEOUT
+                decision.timeout_seconds = self._timeout_seconds
+            elif self._burst_rate and rng.random() < self._burst_rate:
+                self._burst_remaining = self._burst_length - 1
+                decision.fault = FAULT_ERROR
+
+            if decision.fault == FAULT_ERROR:
+                decision.error_status = self._burst_status
+
+            if decision.fault:
+                self.faults[decision.fault] += 1
+                decision.failed_indexes.clear()
+            for idx in decision.failed_indexes:
+                entity_type = _entity_type(events[idx])
+                self.partial_by_entity_type[entity_type] = self.partial_by_entity_type.get(entity_type, 0) + 1
+            self.faults[FAULT_PARTIAL] += len(decision.failed_indexes)
+
+            self.injected_latency_seconds += decision.delay
+            self.max_injected_latency_seconds = max(self.max_injected_latency_seconds, decision.delay)
+
+        return decision
+
+    def record_outcome(self, event_count, decision):
+        """Record completed versus faulted events in the per-second timeline"""
+        if decision.fault:
+            completed, faulted = 0, event_count
+        else:
+            faulted = len(decision.failed_indexes)
+            completed = event_count - faulted
+
+        second = int(time.time())
+        with self._lock:
+            if self._timeline and self._timeline[-1][0] == second:
+                self._timeline[-1][1] += completed
+                self._timeline[-1][2] += faulted
+            else:
+                self._timeline.append([second, completed, faulted])
+
+    def get_summary(self):
+        with self._lock:
+            return {
+                'profile': self.name,
+                'requests': self.requests,
+                'faults': dict(self.faults),
+                'partial_failures_by_entity_type': dict(self.partial_by_entity_type),
+                'injected_latency_seconds': round(self.injected_latency_seconds, 3),
+                'max_injected_latency_seconds': round(self.max_injected_latency_seconds, 3),
+                'timeline': [
+                    {'second': second, 'events_completed': completed, 'events_faulted': faulted}
+                    for second, completed, faulted in self._timeline
+                ]
+            }
+
+
+def load_fault_profile(name, profiles_file=None):
+    """Load a fault profile by name from a JSON file or the built-in set"""
+    if profiles_file:
+        with open(profiles_file, 'r', encoding='utf-8') as f:
+            profiles = json.load(f).get('profiles', {})
+        if name in profiles:
+            return FaultInjector(name, profiles[name])
+
+    if name in BUILTIN_PROFILES:
+        return FaultInjector(name, BUILTIN_PROFILES[name])
+
+    raise ValueError(f'Unknown fault profile: {name!r}')
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Sampling Profiler for the Debug Webhook Server
+
+Finds where request time goes when the receiver slows down under load.
+While a session runs, the stacks of all request threads are sampled at a
+fixed interval, cut at the handler entry point (do_POST / do_GET) and
+aggregated into hot stacks (folded, flamegraph-compatible) and hot
+functions. tracemalloc is traced for the same period to report the top
+allocation sites.
+
+Sessions are bounded in time and nothing is instrumented: when no session
+is running, the request path does not pay anything.
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Frames where the request path starts; anything above is server plumbing
+ENTRY_FUNCTIONS = ('do_POST', 'do_GET')
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is already running"""
+
+
+class RequestProfiler:
+    """Bounded sampling sessions over the request handler threads"""
+
+    def __init__(self, interval=0.005, max_seconds=60, top=20):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.top = top
+        self._lock = threading.Lock()
+        self.sessions = 0
+
+    def run(self, seconds, interval=None, trace_memory=True):
+        """Sample request threads for `seconds` in the calling thread and return a report"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy('A profiling session is already running')
+        try:
+            return self._run(min(seconds, self.max_seconds), interval or self.interval, trace_memory)
+        finally:
+            self._lock.release()
+
+    def _run(self, seconds, interval, trace_memory):
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+        memory_before = tracemalloc.take_snapshot() if trace_memory else None
+
+        own_thread = threading.get_ident()
+        stacks = {}
+        ticks = 0
+        request_samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while time.perf_counter() < deadline:
+            time.sleep(interval)
+            ticks += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = _request_stack(frame)
+                if stack:
+                    request_samples += 1
+                    stacks[stack] = stacks.get(stack, 0) + 1
+
+        report = {
+            'seconds': round(time.perf_counter() - started, 3),
+            'interval_ms': interval * 1000,
+            'ticks': ticks,
+            'request_samples': request_samples,
+            'hot_stacks': _top_stacks(stacks, request_samples, self.top),
+            'hot_functions': _top_functions(stacks, request_samples, self.top)
+        }
+
+        if trace_memory:
+            memory_after = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            report['allocations'] = _top_allocations(memory_before, memory_after, self.top)
+
+        self.sessions += 1
+        return report
+
+
+def _request_stack(frame):
+    """Return the stack from the handler entry point to `frame` as a tuple, or None"""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+        if code.co_name in ENTRY_FUNCTIONS:
+            return tuple(reversed(frames))
+        frame = frame.f_back
+    return None
+
+
+def _percent(count, total):
+    return round(100.0 * count / total, 1) if total else 0.0
+
+
+def _top_stacks(stacks, total, top):
+    ranked = sorted(stacks.items(), key=lambda item: -item[1])[:top]
+    return [
+        {'stack': ';'.join(stack), 'samples': count, 'percent': _percent(count, total)}
+        for stack, count in ranked
+    ]
+
+
+def _top_functions(stacks, total, top):
+    # Self samples (leaf frame) and inclusive samples (anywhere on the stack)
+    self_counts = {}
+    inclusive_counts = {}
+    for stack, count in stacks.items():
+        leaf = stack[-1].rsplit(':', 1)[0] + ')'
+        self_counts[leaf] = self_counts.get(leaf, 0) + count
+        for function in set(entry.rsplit(':', 1)[0] + ')' for entry in stack):
+            inclusive_counts[function] = inclusive_counts.get(function, 0) + count
+    ranked = sorted(inclusive_counts.items(), key=lambda item: (-self_counts.get(item[0], 0), -item[1]))[:top]
+    return [
+        {
+            'function': function,
+            'self_percent': _percent(self_counts.get(function, 0), total),
+            'inclusive_percent': _percent(count, total)
+        }
+        for function, count in ranked
+    ]
+
+
+def _top_allocations(before, after, top):
+    exclude = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    differences = after.filter_traces(exclude).compare_to(before.filter_traces(exclude), 'lineno')
+    ranked = sorted(differences, key=lambda stat: -stat.size_diff)[:top]
+    return [
+        {
+            'site': f'{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+            'size_diff_kb': round(stat.size_diff / 1024, 1),
+            'count_diff': stat.count_diff,
+            'size_kb': round(stat.size / 1024, 1)
+        }
+        for stat in ranked
+    ]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Token-Bucket Rate Limiting for the Debug Webhook Server
+
+Emulates an Odoo instance that throttles: limits on events per second and
+bytes per second, globally and per shop. Requests over the limit are
+answered with HTTP 429 and a Retry-After computed from the bucket deficits,
+so the module's behaviour under throttling can be tested and the highest
+batch size and cron frequency for a given Odoo capacity can be found.
+
+A request is admitted only if every bucket it passes through (shop events,
+shop bytes, global events, global bytes) has enough tokens; tokens are then
+taken from all of them at once, so a throttled request consumes nothing.
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import math
+import threading
+import time
+
+# One lock for all scopes keeps multi-bucket admission atomic
+_admission_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate, capacity, now):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        if amount <= self.tokens:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class RateLimit:
+    """Events/s and bytes/s buckets for one scope (global or one shop)"""
+
+    def __init__(self, name, events_per_second=None, bytes_per_second=None,
+                 burst_seconds=1.0, clock=time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.events_per_second = events_per_second
+        self.bytes_per_second = bytes_per_second
+        self.burst_seconds = burst_seconds
+
+        now = clock()
+        self.buckets = {}
+        if events_per_second:
+            self.buckets['events'] = TokenBucket(events_per_second, events_per_second * burst_seconds, now)
+        if bytes_per_second:
+            self.buckets['bytes'] = TokenBucket(bytes_per_second, bytes_per_second * burst_seconds, now)
+
+        self.admitted_requests = 0
+        self.admitted_events = 0
+        self.admitted_bytes = 0
+        self.throttled_requests = 0
+        self.throttled_events = 0
+        self.throttled_bytes = 0
+        self.oversize_requests = 0
+
+    def get_summary(self):
+        with _admission_lock:
+            return {
+                'events_per_second': self.events_per_second,
+                'bytes_per_second': self.bytes_per_second,
+                'burst_seconds': self.burst_seconds,
+                'admitted_requests': self.admitted_requests,
+                'admitted_events': self.admitted_events,
+                'admitted_bytes': self.admitted_bytes,
+                'throttled_requests': self.throttled_requests,
+                'throttled_events': self.throttled_events,
+                'throttled_bytes': self.throttled_bytes,
+                'oversize_requests': self.oversize_requests,
+                'tokens': {kind: round(bucket.tokens, 2) for kind, bucket in self.buckets.items()}
+            }
+
+
+class Admission:
+    """Outcome of an admission check"""
+
+    def __init__(self, admitted, retry_after=0.0, limited_by=None, oversize=False):
+        self.admitted = admitted
+        self.retry_after = retry_after
+        self.limited_by = limited_by
+        self.oversize = oversize
+
+    @property
+    def retry_after_header(self):
+        """Retry-After value in whole seconds, rounded up so it is never early"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def admit(limits, event_count, byte_count):
+    """Admit a request through all given RateLimit scopes, or report why not"""
+    amounts = {'events': event_count, 'bytes': byte_count}
+
+    with _admission_lock:
+        retry_after = 0.0
+        limited_by = None
+        oversize = None
+
+        for limit in limits:
+            now = limit.clock()
+            for kind, bucket in limit.buckets.items():
+                bucket.refill(now)
+                if amounts[kind] > bucket.capacity:
+                    oversize = f'{limit.name}:{kind}'
+                    continue
+                wait = bucket.wait_time(amounts[kind])
+                if wait > retry_after:
+                    retry_after = wait
+                    limited_by = f'{limit.name}:{kind}'
+
+        if oversize:
+            # Can never be admitted: waiting would not help
+            for limit in limits:
+                limit.oversize_requests += 1
+            return Admission(False, limited_by=oversize, oversize=True)
+
+        if retry_after > 0:
+            for limit in limits:
+                limit.throttled_requests += 1
+                limit.throttled_events += event_count
+                limit.throttled_bytes += byte_count
+            return Admission(False, retry_after=retry_after, limited_by=limited_by)
+
+        for limit in limits:
+            for kind, bucket in limit.buckets.items():
+                bucket.tokens -= amounts[kind]
+            limit.admitted_requests += 1
+            limit.admitted_events += event_count
+            limit.admitted_bytes += byte_count
+
+    return Admission(True)
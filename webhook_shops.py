@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Odoo Sales Sync - Multi-Shop Routing for the Debug Webhook Server
+
+Maps `/webhook/<shop>` paths to per-shop contexts so a single receiver
+process can serve several PrestaShop shops. Each shop has its own secret,
+statistics, coalescer, no-op detector, sales aggregates, log file, queue
+limits and rate limits, so one noisy shop cannot hide another shop's latency
+or failures.
+
+Shops config file format (JSON):
+
+    {
+        "shops": {
+            "es": {"secret": "es_secret", "log_file": "logs/es.log"},
+            "fr": {"secret": "fr_secret", "max_batch_events": 200,
+                   "max_body_bytes": 5242880,
+                   "rate_limit_events": 50, "rate_limit_bytes": 1048576}
+        }
+    }
+
+Author: Odoo Sales Sync Module
+Version: 1.0.0
+"""
+
+import json
+import re
+
+DEFAULT_SHOP = 'default'
+WEBHOOK_PATH = '/webhook'
+
+SHOP_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+SHOP_CONFIG_KEYS = ('secret', 'log_file', 'max_batch_events', 'max_body_bytes',
+                    'rate_limit_events', 'rate_limit_bytes')
+
+
+class ShopContext:
+    """Per-shop configuration and state"""
+
+    def __init__(self, name, secret=None, stats=None, coalescer=None,
+                 file_logger=None, log_file_path=None,
+                 max_batch_events=None, max_body_bytes=None, rate_limit=None,
+                 aggregates=None, noop_detector=None):
+        self.name = name
+        self.secret = secret
+        self.stats = stats
+        self.coalescer = coalescer
+        self.file_logger = file_logger
+        self.log_file_path = log_file_path
+        # Queue limits: None means unlimited
+        self.max_batch_events = max_batch_events
+        self.max_body_bytes = max_body_bytes
+        # Token-bucket RateLimit for this shop, or None
+        self.rate_limit = rate_limit
+        # Incremental SalesAggregates built from this shop's order events
+        self.aggregates = aggregates
+        # NoopDetector classifying this shop's update events
+        self.noop_detector = noop_detector
+
+    @property
+    def path(self):
+        if self.name == DEFAULT_SHOP:
+            return WEBHOOK_PATH
+        return f'{WEBHOOK_PATH}/{self.name}'
+
+    def get_limits(self):
+        return {
+            'max_batch_events': self.max_batch_events,
+            'max_body_bytes': self.max_body_bytes
+        }
+
+
+class ShopRegistry:
+    """O(1) dispatch from request path to ShopContext"""
+
+    def __init__(self):
+        self.shops = {}
+        self._by_path = {}
+
+    def register(self, shop):
+        if shop.name != DEFAULT_SHOP and not SHOP_NAME_PATTERN.match(shop.name):
+            raise ValueError(f'Invalid shop name: {shop.name!r}')
+        self.shops[shop.name] = shop
+        self._by_path[shop.path] = shop
+        return shop
+
+    def resolve(self, path):
+        """Return the ShopContext for a request path, or None"""
+        return self._by_path.get(path)
+
+    def get(self, name):
+        return self.shops.get(name)
+
+    @property
+    def default(self):
+        return self.shops.get(DEFAULT_SHOP)
+
+    def __iter__(self):
+        return iter(self.shops.values())
+
+    def __len__(self):
+        return len(self.shops)
+
+
+def load_shops_config(config_path):
+    """Load and validate a shops config file, returning {name: options}"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    shops = config.get('shops')
+    if not isinstance(shops, dict) or not shops:
+        raise ValueError('Shops config must contain a non-empty "shops" object')
+
+    validated = {}
+    for name, options in shops.items():
+        if not SHOP_NAME_PATTERN.match(name):
+            raise ValueError(f'Invalid shop name: {name!r}')
+        if name == DEFAULT_SHOP:
+            raise ValueError(f'Shop name {DEFAULT_SHOP!r} is reserved for {WEBHOOK_PATH}')
+        options = options or {}
+        unknown = set(options) - set(SHOP_CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f'Unknown options for shop {name!r}: {", ".join(sorted(unknown))}')
+        for key in ('max_batch_events', 'max_body_bytes'):
+            value = options.get(key)
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                raise ValueError(f'{key} for shop {name!r} must be a positive integer')
+        for key in ('rate_limit_events', 'rate_limit_bytes'):
+            value = options.get(key)
+            if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+                raise ValueError(f'{key} for shop {name!r} must be a positive number')
+        validated[name] = options
+
+    return validated